@@ -0,0 +1,30 @@
+"""Micro-benchmark for ids.py: python bench/ids_bench.py [count]"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ids import new_order_id, order_ids  # noqa: E402
+
+
+def main(count):
+    for label, func in (("next_int", order_ids.next_int), ("new_order_id", new_order_id)):
+        started = time.perf_counter()
+        for _ in range(count):
+            func()
+        elapsed = time.perf_counter() - started
+        print(f"{label}: {count / elapsed:,.0f} ids/s")
+
+    for label, func in (("next_ints", order_ids.next_ints), ("next_ids", order_ids.next_ids)):
+        started = time.perf_counter()
+        func(count)
+        elapsed = time.perf_counter() - started
+        print(f"{label} (batch of {count}): {count / elapsed:,.0f} ids/s")
+
+    sample = [new_order_id() for _ in range(100_000)] + [f"ORD-{value}" for value in order_ids.next_ids(100_000)]
+    assert len(set(sample)) == len(sample) and sample == sorted(sample)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
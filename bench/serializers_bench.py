@@ -0,0 +1,69 @@
+"""Micro-benchmark for serializers.py: python bench/serializers_bench.py [rows]"""
+import os
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serializers import PROVIDERS, serialize_animal, serialize_order  # noqa: E402
+
+
+def by_hand(order):
+    return {
+        'id': order.id,
+        'order_id': order.order_id,
+        'user_id': order.user_id,
+        'animal_id': order.animal_id,
+        'quantity': order.quantity,
+        'status': order.status,
+        'created_at': order.created_at
+    }
+
+
+def _elapsed(func):
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main(count):
+    app = Flask(__name__)
+    orders = [
+        SimpleNamespace(id=i, order_id=f"ORD-{i:020d}", user_id=i % 97, animal_id=i % 1013, quantity=1,
+                        status='payment_success', created_at=datetime(2024, 11, 1, 12, 30, i % 60, i % 1000))
+        for i in range(count)
+    ]
+    animals = [
+        SimpleNamespace(id=i, farmer_id=i % 97, type_id=1, breed_id=2, age=i % 12, price=Decimal('15000.00'),
+                        description='Healthy heifer, vaccinated and dewormed', is_available=True)
+        for i in range(count)
+    ]
+
+    def timed(label, func, rounds=5):
+        best = min(_elapsed(func) for _ in range(rounds))
+        print(f"{label}: {best * 1000:.1f} ms ({count / best:,.0f} rows/s)")
+        return best
+
+    print(f"{count} rows, best of 5")
+    timed("orders, hand-written dicts", lambda: [by_hand(order) for order in orders])
+    timed("orders, make_serializer", lambda: [serialize_order(order) for order in orders])
+
+    with app.app_context():
+        for label, rows, serializer in (("orders", orders, serialize_order), ("animals", animals, serialize_animal)):
+            payload = [serializer(row) for row in rows]
+            flask_default = DefaultJSONProvider(app)
+            baseline = timed(f"{label}, Flask default jsonify", lambda: flask_default.response(payload))
+            for name, provider_class in PROVIDERS.items():
+                provider = provider_class(app)
+                elapsed = timed(f"{label}, {name} jsonify", lambda: provider.response(payload))
+                print(f"  {baseline / elapsed:.1f}x the default provider")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,118 @@
+from decimal import Decimal, InvalidOperation
+from models import db, Animal
+from refcache import reference_cache
+from sqlalchemy import insert
+
+import csv
+import io
+import json
+
+REQUIRED_FIELDS = ('type_id', 'breed_id', 'age', 'price')
+
+
+def _csv_rows(text_stream):
+    for record in csv.DictReader(text_stream):
+        yield record
+
+
+def _ndjson_rows(text_stream):
+    for line in text_stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield ValueError("Invalid JSON")
+            continue
+        yield record if isinstance(record, dict) else ValueError("Each line must be a JSON object")
+
+
+def _validate(record, farmer_id, breeds):
+    """Turn one input record into Animal column values, or raise ValueError."""
+    missing = [field for field in REQUIRED_FIELDS if record.get(field) in (None, '')]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+    try:
+        type_id = int(record['type_id'])
+        breed_id = int(record['breed_id'])
+        age = int(record['age'])
+    except (TypeError, ValueError):
+        raise ValueError("type_id, breed_id and age must be integers")
+
+    try:
+        price = Decimal(str(record['price']))
+    except InvalidOperation:
+        raise ValueError("price must be a number")
+    if not price.is_finite():
+        raise ValueError("price must be a number")
+
+    if age < 0 or price < 0:
+        raise ValueError("age and price must not be negative")
+
+    if breed_id not in breeds:
+        raise ValueError(f"Unknown breed_id {breed_id}")
+    if breeds[breed_id] != type_id:
+        raise ValueError(f"breed_id {breed_id} does not belong to type_id {type_id}")
+
+    return {
+        "farmer_id": farmer_id,
+        "type_id": type_id,
+        "breed_id": breed_id,
+        "age": age,
+        "price": price,
+        "description": record.get('description') or '',
+        "is_available": True,
+    }
+
+
+def import_animals(stream, data_format, farmer_id, batch_size, max_errors):
+    """Validate and insert listings from a CSV or NDJSON byte stream.
+
+    Rows are read one at a time and inserted with a multi-row INSERT every
+    `batch_size` valid rows, each batch in its own transaction, so memory use
+    does not depend on the size of the upload. Only the first `max_errors`
+    errors are reported in detail.
+    """
+    text_stream = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    records = _csv_rows(text_stream) if data_format == 'csv' else _ndjson_rows(text_stream)
+
+    # breed id -> type id, from the reference cache
+    breeds = {row["id"]: row["type_id"] for row in reference_cache.rows('breeds')}
+
+    report = {"inserted": 0, "failed": 0, "errors": [], "errors_truncated": False}
+    batch = []
+
+    def flush():
+        if batch:
+            db.session.execute(insert(Animal), batch)
+            db.session.commit()
+            report["inserted"] += len(batch)
+            batch.clear()
+
+    def fail(row_number, message):
+        report["failed"] += 1
+        if len(report["errors"]) < max_errors:
+            report["errors"].append({"row": row_number, "error": message})
+        else:
+            report["errors_truncated"] = True
+
+    try:
+        for row_number, record in enumerate(records, start=1):
+            if isinstance(record, Exception):
+                fail(row_number, str(record))
+                continue
+            try:
+                batch.append(_validate(record, farmer_id, breeds))
+            except ValueError as e:
+                fail(row_number, str(e))
+                continue
+            if len(batch) >= batch_size:
+                flush()
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Unreadable input stops the import; earlier batches stay committed
+        report["aborted"] = f"Could not read upload: {e}"
+
+    flush()
+    return report
@@ -0,0 +1,141 @@
+from datetime import datetime
+from models import db, CallbackIntake, CallbackMetadatum, Request, Transaction
+from sqlalchemy import func, insert, select, update
+
+# Arbitrary key for the advisory lock that keeps batch processors from
+# working on the same CheckoutRequestIDs at once
+_PROCESSOR_LOCK_KEY = 7261001
+
+# Safaricom item names mapped to CallbackMetadata columns
+_METADATA_FIELDS = {
+    "Amount": "Amount",
+    "MpesaReceiptNumber": "MpesaReceiptNumber",
+    "TransactionDate": "TransactionDate",
+    "PhoneNumber": "PhoneNumber",
+}
+
+
+def enqueue_callback(payload):
+    """Store a raw Safaricom callback so it can be acknowledged straight away."""
+    try:
+        checkout_request_id = payload["Body"]["stkCallback"]["CheckoutRequestID"]
+    except (KeyError, TypeError):
+        checkout_request_id = None
+
+    db.session.execute(insert(CallbackIntake).values(
+        CheckoutRequestID=checkout_request_id,
+        payload=payload,
+        status='pending',
+        received_at=datetime.utcnow()
+    ))
+    db.session.commit()
+
+
+def _parse(payload):
+    callback = payload["Body"]["stkCallback"]
+    parsed = {
+        "MerchantRequestID": callback["MerchantRequestID"],
+        "CheckoutRequestID": callback["CheckoutRequestID"],
+        "ResultCode": str(callback["ResultCode"]),
+        "ResultDesc": callback["ResultDesc"],
+        "metadata": None,
+    }
+    if str(callback["ResultCode"]) == "0":
+        items = callback["CallbackMetadata"]["Item"]
+        values = {item["Name"]: item.get("Value") for item in items}
+        parsed["metadata"] = {column: values.get(name) for name, column in _METADATA_FIELDS.items()}
+    return parsed
+
+
+def process_pending_callbacks(batch_size=500):
+    """Turn one batch of queued callbacks into Transaction/CallbackMetadata rows.
+
+    Returns the number of intake rows handled.
+    """
+    db.session.execute(select(func.pg_advisory_xact_lock(_PROCESSOR_LOCK_KEY)))
+
+    intake_rows = db.session.execute(
+        select(CallbackIntake.id, CallbackIntake.payload)
+        .where(CallbackIntake.status == 'pending')
+        .order_by(CallbackIntake.id)
+        .limit(batch_size)
+    ).all()
+
+    if not intake_rows:
+        db.session.commit()
+        return 0
+
+    now = datetime.utcnow()
+    outcomes = {}
+    parsed_by_checkout = {}
+
+    for intake_id, payload in intake_rows:
+        try:
+            parsed = _parse(payload)
+        except (KeyError, TypeError, IndexError) as e:
+            outcomes[intake_id] = ('failed', f"Malformed callback: {e}")
+            continue
+
+        # Safaricom retries slow callbacks, keep the first one we received
+        if parsed["CheckoutRequestID"] in parsed_by_checkout:
+            outcomes[intake_id] = ('duplicate', None)
+            continue
+        parsed_by_checkout[parsed["CheckoutRequestID"]] = (intake_id, parsed)
+
+    checkout_ids = list(parsed_by_checkout)
+
+    if checkout_ids:
+        already_processed = set(db.session.scalars(
+            select(Transaction.CheckoutRequestID)
+            .where(Transaction.CheckoutRequestID.in_(checkout_ids))
+        ))
+        request_ids = dict(db.session.execute(
+            select(Request.CheckoutRequestID, func.min(Request.id))
+            .where(Request.CheckoutRequestID.in_(checkout_ids))
+            .group_by(Request.CheckoutRequestID)
+        ).all())
+
+        new_transactions = []
+        for checkout_id in checkout_ids:
+            intake_id, parsed = parsed_by_checkout[checkout_id]
+            if checkout_id in already_processed:
+                outcomes[intake_id] = ('duplicate', None)
+                continue
+            new_transactions.append({
+                "Request_id": request_ids.get(checkout_id),
+                "MerchantRequestID": parsed["MerchantRequestID"],
+                "CheckoutRequestID": checkout_id,
+                "ResultCode": parsed["ResultCode"],
+                "ResultDesc": parsed["ResultDesc"],
+                "created_at": now,
+            })
+            outcomes[intake_id] = ('processed', None)
+
+        if new_transactions:
+            inserted = db.session.execute(
+                insert(Transaction).returning(Transaction.id, Transaction.CheckoutRequestID),
+                new_transactions
+            ).all()
+
+            new_metadata = []
+            for transaction_id, checkout_id in inserted:
+                metadata = parsed_by_checkout[checkout_id][1]["metadata"]
+                if metadata is not None:
+                    new_metadata.append(dict(metadata, transaction_id=transaction_id, created_at=now))
+
+            if new_metadata:
+                db.session.execute(insert(CallbackMetadatum), new_metadata)
+
+    by_outcome = {}
+    for intake_id, outcome in outcomes.items():
+        by_outcome.setdefault(outcome, []).append(intake_id)
+
+    for (status, error), ids in by_outcome.items():
+        db.session.execute(
+            update(CallbackIntake)
+            .where(CallbackIntake.id.in_(ids))
+            .values(status=status, error=error, processed_at=now)
+        )
+
+    db.session.commit()
+    return len(intake_rows)
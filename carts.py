@@ -0,0 +1,36 @@
+from models import db, Animal, Cart, Type
+from serializers import serialize_cart_item
+from sqlalchemy import func, select
+
+
+def get_cart_pricing(cart_id, user_id):
+    """Line items and grand total for a cart, priced in one query.
+
+    Line totals and the grand total are computed by Postgres on the Numeric
+    price column, so Decimal precision is kept. Returns None for an empty cart.
+    """
+    line_total = Animal.price * Cart.quantity
+
+    rows = db.session.execute(
+        select(
+            Animal.id.label('animal_id'),
+            Type.name.label('animal_name'),
+            Animal.price.label('price_per_item'),
+            Cart.quantity,
+            line_total.label('total_price'),
+            func.sum(line_total).over().label('total_amount')
+        )
+        .select_from(Cart)
+        .join(Animal, Cart.animal_id == Animal.id)
+        .outerjoin(Type, Animal.type_id == Type.id)
+        .where(Cart.id == cart_id, Cart.user_id == user_id)
+        .order_by(Cart.id, Animal.id)
+    ).all()
+
+    if not rows:
+        return None
+
+    return {
+        "payment_data": [serialize_cart_item(row) for row in rows],
+        "total_amount": rows[0].total_amount
+    }
@@ -0,0 +1,112 @@
+from decimal import Decimal
+from models import db, Animal
+from pagination import encode_cursor, decode_cursor, keyset_filter, keyset_order
+from refcache import reference_cache
+from search import search_clause
+from serializers import make_serializer
+from sqlalchemy import select
+
+# Sort keys accepted by the catalogue, mapped to (column, cursor value type).
+# All are NOT NULL and backed by a (column, id) index, see keyset_order.
+SORT_KEYS = {
+    'id': (Animal.id, int),
+    'price': (Animal.price, Decimal),
+    'age': (Animal.age, int),
+}
+
+# Exactly the columns the catalogue serializes; image and search_vector are never
+# selected. Type and breed names come from the reference cache, not a join.
+CATALOGUE_COLUMNS = (
+    Animal.id,
+    Animal.farmer_id,
+    Animal.type_id,
+    Animal.breed_id,
+    Animal.age,
+    Animal.price,
+    Animal.description,
+    Animal.is_available,
+)
+
+
+def catalogue_select(*extra_columns):
+    """One SELECT over Animals, no lazy loads afterwards."""
+    return select(*CATALOGUE_COLUMNS, *extra_columns).select_from(Animal)
+
+
+_serialize_columns = make_serializer('serialize_listing_columns', (
+    'id', 'farmer_id', 'age', 'price', 'description', 'is_available'
+))
+
+
+def serialize_listing(row, type_names, breed_names):
+    listing = _serialize_columns(row)
+    listing['type'] = type_names.get(row.type_id)
+    listing['breed'] = breed_names.get(row.breed_id)
+    return listing
+
+
+def listing_query(limit, sort='id', animal_type=None, animal_breed=None, search_text=None, after=None):
+    """The SELECT behind one catalogue page, fetching `limit` + 1 rows.
+
+    Each row carries the sort key as `sort_value` for the next cursor.
+    Raises pagination.InvalidCursor for a bad `after`.
+    """
+    descending = sort.startswith('-') or sort == 'relevance'
+    sort_key = sort.lstrip('-')
+
+    if search_text:
+        matches, rank = search_clause(search_text)
+
+    if sort_key == 'relevance':
+        sort_column, cursor_type, nullable = rank, float, True
+    else:
+        (sort_column, cursor_type), nullable = SORT_KEYS[sort_key], False
+
+    # Listings always had a type and breed (they used to be inner joins)
+    query = catalogue_select(sort_column.label('sort_value')).where(
+        Animal.type_id.is_not(None),
+        Animal.breed_id.is_not(None)
+    )
+
+    # Name filters are resolved to ids from the reference cache
+    if animal_type:
+        query = query.where(Animal.type_id.in_(reference_cache.matching_type_ids(animal_type)))
+    if animal_breed:
+        query = query.where(Animal.breed_id.in_(reference_cache.matching_breed_ids(animal_breed)))
+    if search_text:
+        query = query.where(matches)
+
+    if after:
+        value, last_id = decode_cursor(after, sort)
+        query = query.where(keyset_filter(sort_column, Animal.id, descending, value, last_id, cast=cursor_type, nullable=nullable))
+
+    # Fetch one extra row to know whether there is a next page
+    return query.order_by(*keyset_order(sort_column, Animal.id, descending, nullable=nullable)).limit(limit + 1)
+
+
+def list_animals(limit, sort='id', animal_type=None, animal_breed=None, search_text=None, after=None):
+    """One page of listings and the cursor for the next page (None on the last page).
+
+    Raises pagination.InvalidCursor for a bad `after`.
+    """
+    rows = db.session.execute(
+        listing_query(limit, sort, animal_type, animal_breed, search_text, after)
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, rows[-1].sort_value, rows[-1].id)
+
+    type_names = reference_cache.type_names()
+    breed_names = reference_cache.breed_names()
+    return [serialize_listing(row, type_names, breed_names) for row in rows], next_cursor
+
+
+def get_animal_details(animal_id):
+    row = db.session.execute(
+        catalogue_select().where(Animal.id == animal_id)
+    ).first()
+    if not row:
+        return None
+    return serialize_listing(row, reference_cache.type_names(), reference_cache.breed_names())
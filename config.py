@@ -6,12 +6,99 @@ load_dotenv()
 # Configuration settings for example db, environment variables
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URI")
+    # Connection pool per worker process; keep
+    # workers x (DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW) below Postgres max_connections
+    DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "5"))
+    DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+    # Seconds a request waits for a free connection before failing
+    DATABASE_POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", "10"))
+    # Seconds after which a connection is replaced, and whether to test it on checkout
+    DATABASE_POOL_RECYCLE = int(os.getenv("DATABASE_POOL_RECYCLE", "1800"))
+    DATABASE_POOL_PRE_PING = os.getenv("DATABASE_POOL_PRE_PING", "true").lower() == "true"
+    # Statement timeout for web requests in milliseconds (0 disables it; CLI commands and
+    # migrations never have one) and connect timeout in seconds
+    DATABASE_STATEMENT_TIMEOUT = int(os.getenv("DATABASE_STATEMENT_TIMEOUT", "30000"))
+    DATABASE_CONNECT_TIMEOUT = int(os.getenv("DATABASE_CONNECT_TIMEOUT", "5"))
     SQLALCHEMY_TRACK_MODIFICATION = False
     CONSUMER_KEY = os.getenv("CONSUMER_KEY")
     CONSUMER_SECRET = os.getenv("CONSUMER_SECRET")
     MPESA_PASSKEY = os.getenv("MPESA_PASSKEY")
     MPESA_BUSINESS_SHORTCODE=os.getenv("MPESA_BUSINESS_SHORTCODE")
+    # Point this at a local stub OAuth server when testing; empty means the sandbox
+    MPESA_AUTH_URL = os.getenv("MPESA_AUTH_URL") or "https://sandbox.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials"
+    # Seconds before expiry at which a cached M-Pesa token is refreshed
+    MPESA_TOKEN_REFRESH_MARGIN = int(os.getenv("MPESA_TOKEN_REFRESH_MARGIN", "300"))
+    # Shared Daraja HTTP client; size the pool to the worker's concurrency
+    DARAJA_POOL_SIZE = int(os.getenv("DARAJA_POOL_SIZE", "10"))
+    DARAJA_CONNECT_TIMEOUT = float(os.getenv("DARAJA_CONNECT_TIMEOUT", "3.05"))
+    DARAJA_READ_TIMEOUT = float(os.getenv("DARAJA_READ_TIMEOUT", "30"))
+    DARAJA_MAX_RETRIES = int(os.getenv("DARAJA_MAX_RETRIES", "2"))
+    # Background STK push workers and the maximum number of queued pushes
+    PAYMENT_WORKERS = int(os.getenv("PAYMENT_WORKERS", "4"))
+    PAYMENT_QUEUE_SIZE = int(os.getenv("PAYMENT_QUEUE_SIZE", "200"))
+    # Seconds a finished payment's status stays queryable
+    PAYMENT_RESULT_TTL = int(os.getenv("PAYMENT_RESULT_TTL", "3600"))
     JWT_SECRET_KEY = os.getenv("SECRET_KEY")
+    # JWT revocation: "database" is shared by all workers, "memory" is per process
+    REVOCATION_BACKEND = os.getenv("REVOCATION_BACKEND", "database")
+    REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+    # Seconds between picking up revocations made by other workers
+    REVOCATION_SYNC_INTERVAL = int(os.getenv("REVOCATION_SYNC_INTERVAL", "5"))
+    REVOCATION_SYNC_OVERLAP = int(os.getenv("REVOCATION_SYNC_OVERLAP", "5"))
+    REVOCATION_BLOOM_REBUILD_INTERVAL = int(os.getenv("REVOCATION_BLOOM_REBUILD_INTERVAL", "3600"))
+    # Lifetime used for tokens without an exp claim
+    REVOCATION_DEFAULT_TTL = int(os.getenv("REVOCATION_DEFAULT_TTL", "2592000"))
+    # Verified-token cache used by with_user_middleware
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    TOKEN_CACHE_MAX_TTL = int(os.getenv("TOKEN_CACHE_MAX_TTL", "900"))
+    # Socket.IO message queue shared by all workers, e.g. redis://localhost:6379/0.
+    # "local://" uses an in-process stand-in; empty means a single worker.
+    SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE")
+    SOCKETIO_CHANNEL = os.getenv("SOCKETIO_CHANNEL", "farmart-socketio")
+    # Notifications for the same room within this many seconds go out as one event
+    SOCKETIO_BATCH_INTERVAL = float(os.getenv("SOCKETIO_BATCH_INTERVAL", "0.25"))
+    SOCKETIO_BATCH_MAX_MESSAGES = int(os.getenv("SOCKETIO_BATCH_MAX_MESSAGES", "20"))
+    # Node part of generated order ids; set a distinct value per host
+    ORDER_ID_NODE_ID = int(os.environ["ORDER_ID_NODE_ID"]) if os.getenv("ORDER_ID_NODE_ID") else None
+    # JSON encoder behind jsonify: "orjson" (fast) or "stdlib"
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
+    # Password hashing cost and the native threads it runs on
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "pbkdf2:sha256:600000")
+    PASSWORD_SALT_LENGTH = int(os.getenv("PASSWORD_SALT_LENGTH", "16"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+    # Page size for catalogue listings and the hard server-side cap
+    CATALOGUE_DEFAULT_LIMIT = int(os.getenv("CATALOGUE_DEFAULT_LIMIT", "20"))
+    CATALOGUE_MAX_LIMIT = int(os.getenv("CATALOGUE_MAX_LIMIT", "100"))
+    # The same for a farmer's notification inbox
+    INBOX_DEFAULT_LIMIT = int(os.getenv("INBOX_DEFAULT_LIMIT", "20"))
+    INBOX_MAX_LIMIT = int(os.getenv("INBOX_MAX_LIMIT", "100"))
+    # Seconds a worker keeps its copy of Types, Breeds and Roles
+    REFERENCE_CACHE_TTL = int(os.getenv("REFERENCE_CACHE_TTL", "300"))
+    # Seconds between checks for writes made by other workers (see ReferenceVersions)
+    REFERENCE_CACHE_CHECK_SECONDS = float(os.getenv("REFERENCE_CACHE_CHECK_SECONDS", "5"))
+    # Rows per INSERT/commit for bulk listing imports, and detailed errors reported
+    BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "1000"))
+    BULK_IMPORT_MAX_ERRORS = int(os.getenv("BULK_IMPORT_MAX_ERRORS", "1000"))
+    # Roles allowed to download payment exports, and rows fetched per round trip
+    EXPORT_ROLES = [role.strip() for role in os.getenv("EXPORT_ROLES", "admin,finance").split(",") if role.strip()]
+    EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "5000"))
+    # Statement timeout for export queries in milliseconds, replacing DATABASE_STATEMENT_TIMEOUT
+    # for the export transaction; 0 disables it
+    EXPORT_STATEMENT_TIMEOUT = int(os.getenv("EXPORT_STATEMENT_TIMEOUT", "0"))
+    # Roles allowed to read /metrics (pool, queue and Daraja internals)
+    METRICS_ROLES = [role.strip() for role in os.getenv("METRICS_ROLES", "admin").split(",") if role.strip()]
+    # How long adding an animal to a cart holds it for that buyer
+    CART_RESERVATION_SECONDS = int(os.getenv("CART_RESERVATION_SECONDS", "900"))
+    # Most animals one buyer can hold in their cart at once
+    CART_MAX_HOLDS = int(os.getenv("CART_MAX_HOLDS", "10"))
+    # Catalogue response cache: per-worker LRU, or shared when RESPONSE_CACHE_URL
+    # points at Redis (e.g. redis://localhost:6379/1)
+    RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL")
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "60"))
+    # Animal images are revalidated with ETags, so they can be cached for long
+    IMAGE_CACHE_MAX_AGE = int(os.getenv("IMAGE_CACHE_MAX_AGE", "604800"))
+    IMAGE_CHUNK_SIZE = int(os.getenv("IMAGE_CHUNK_SIZE", "262144"))
     # JWT_BLACKLIST_ENABLED = True
     # JWT_BLACKLIST_TOKEN_CHECKS = ['access', 'refresh']
     # MAIL_SERVER = 'smtp.gmail.com'
@@ -0,0 +1,91 @@
+from config import Config
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import threading
+import time
+import requests
+
+config = Config()
+
+DARAJA_BASE_URL = "https://sandbox.safaricom.co.ke"
+
+
+def _build_session():
+    # Only idempotent calls are retried, an STK push must never be sent twice
+    retry = Retry(
+        total=config.DARAJA_MAX_RETRIES,
+        connect=config.DARAJA_MAX_RETRIES,
+        read=config.DARAJA_MAX_RETRIES,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        backoff_factor=0.2,
+        backoff_jitter=0.3,
+        raise_on_status=False,
+    )
+    # Keep one warm connection per worker so we don't pay a TLS handshake per call
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=config.DARAJA_POOL_SIZE,
+        pool_block=True,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+session = _build_session()
+
+# Per-call latency counters, keyed by the name passed to get()/post()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(name, elapsed, failed):
+    with _stats_lock:
+        entry = _stats.setdefault(name, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["calls"] += 1
+        if failed:
+            entry["errors"] += 1
+        elapsed_ms = elapsed * 1000
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+
+
+def _timeout():
+    return (config.DARAJA_CONNECT_TIMEOUT, config.DARAJA_READ_TIMEOUT)
+
+
+def request(name, method, url, **kwargs):
+    kwargs.setdefault("timeout", _timeout())
+    started = time.perf_counter()
+    failed = True
+    try:
+        response = session.request(method, url, **kwargs)
+        failed = response.status_code >= 500
+        return response
+    finally:
+        _record(name, time.perf_counter() - started, failed)
+
+
+def get(name, url, **kwargs):
+    return request(name, "GET", url, **kwargs)
+
+
+def post(name, url, **kwargs):
+    return request(name, "POST", url, **kwargs)
+
+
+def stats():
+    with _stats_lock:
+        return {
+            name: {
+                "calls": entry["calls"],
+                "errors": entry["errors"],
+                "avg_ms": round(entry["total_ms"] / entry["calls"], 2) if entry["calls"] else 0.0,
+                "max_ms": round(entry["max_ms"], 2),
+            }
+            for name, entry in _stats.items()
+        }
@@ -0,0 +1,134 @@
+from config import Config
+from flask import has_request_context
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+import psycopg2
+import threading
+import time
+
+try:
+    from eventlet import patcher
+    from eventlet.hubs import trampoline
+except ImportError:
+    patcher = trampoline = None
+
+config = Config()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        # _do_get calls itself while it waits for overflow; only the outer call is timed
+        self._in_checkout = threading.local()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _do_get(self):
+        if getattr(self._in_checkout, 'active', False):
+            return super()._do_get()
+
+        self._in_checkout.active = True
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self._in_checkout.active = False
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self._checkouts += 1
+                self._timeouts += timed_out
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "checked_in": self.checkedin(),
+                "checked_out": self.checkedout(),
+                "overflow": max(self.overflow(), 0),
+                "max_overflow": self._max_overflow,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "wait_seconds_total": round(self._wait_total, 6),
+                "wait_seconds_max": round(self._wait_max, 6),
+                "wait_seconds_avg": round(self._wait_total / self._checkouts, 6) if self._checkouts else 0.0,
+            }
+
+
+def engine_options():
+    """SQLALCHEMY_ENGINE_OPTIONS built from Config."""
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": config.DATABASE_POOL_SIZE,
+        "max_overflow": config.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": config.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": config.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": config.DATABASE_POOL_PRE_PING,
+        "connect_args": {"connect_timeout": config.DATABASE_CONNECT_TIMEOUT},
+    }
+
+
+@event.listens_for(TimedQueuePool, 'checkout')
+def _set_statement_timeout(dbapi_connection, connection_record, connection_proxy):
+    # Only web requests get DATABASE_STATEMENT_TIMEOUT; migrations (CREATE INDEX
+    # CONCURRENTLY) and CLI jobs like reconcile-payments share this engine and
+    # must be able to run long. Each connection remembers its setting, so the
+    # SET is only sent when a connection moves between the two.
+    timeout = config.DATABASE_STATEMENT_TIMEOUT if has_request_context() else 0
+    if connection_record.info.get('statement_timeout') == timeout:
+        return
+
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SET statement_timeout = %s", (timeout,))
+    finally:
+        cursor.close()
+    # Committed, or the pool's reset-on-return rollback would undo it
+    dbapi_connection.commit()
+    connection_record.info['statement_timeout'] = timeout
+
+
+def _eventlet_wait_callback(conn, timeout=None):
+    # Drive libpq's non-blocking protocol, yielding to the hub instead of
+    # blocking the whole worker while Postgres answers
+    while True:
+        state = conn.poll()
+        if state == psycopg2.extensions.POLL_OK:
+            break
+        elif state == psycopg2.extensions.POLL_READ:
+            trampoline(conn.fileno(), read=True)
+        elif state == psycopg2.extensions.POLL_WRITE:
+            trampoline(conn.fileno(), write=True)
+        else:
+            raise psycopg2.OperationalError(f"Bad result from poll: {state!r}")
+
+
+def make_psycopg2_green():
+    """Install the eventlet wait callback when running under a monkey-patched worker.
+
+    psycopg2 talks to Postgres in C, out of reach of monkey patching, so
+    without this every query blocks all green threads on the worker.
+    Returns True if the callback was installed.
+    """
+    if patcher is None or not patcher.is_monkey_patched('socket'):
+        return False
+    psycopg2.extensions.set_wait_callback(_eventlet_wait_callback)
+    return True
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    if isinstance(pool, TimedQueuePool):
+        return pool.stats()
+    return {"status": pool.status()}
@@ -0,0 +1,114 @@
+from config import Config
+from datetime import date, datetime, timedelta
+from models import db, CallbackMetadatum, Order, Request, Transaction
+from sqlalchemy import func, select
+
+import csv
+import io
+import json
+
+config = Config()
+
+EXPORT_COLUMNS = (
+    Order.id.label('order_pk'),
+    Order.order_id,
+    Order.user_id,
+    Order.animal_id,
+    Order.quantity,
+    Order.status.label('order_status'),
+    Order.created_at.label('order_created_at'),
+    Request.id.label('request_id'),
+    Request.MerchantRequestID,
+    Request.CheckoutRequestID,
+    Request.ResponseCode,
+    Request.created_at.label('request_created_at'),
+    Transaction.id.label('transaction_id'),
+    Transaction.ResultCode,
+    Transaction.ResultDesc,
+    Transaction.created_at.label('transaction_created_at'),
+    CallbackMetadatum.Amount,
+    CallbackMetadatum.MpesaReceiptNumber,
+    CallbackMetadatum.TransactionDate,
+    CallbackMetadatum.PhoneNumber,
+)
+
+FIELDNAMES = [column.key for column in EXPORT_COLUMNS]
+
+
+def parse_date_range(start, end):
+    """Dates as YYYY-MM-DD; `end` is inclusive. Raises ValueError for bad input."""
+    start_at = datetime.combine(date.fromisoformat(start), datetime.min.time()) if start else None
+    end_before = datetime.combine(date.fromisoformat(end) + timedelta(days=1), datetime.min.time()) if end else None
+    return start_at, end_before
+
+
+def payment_query(start_at, end_before):
+    """Orders joined to their payment requests, transactions and receipts."""
+    query = (
+        select(*EXPORT_COLUMNS)
+        .select_from(Order)
+        .outerjoin(Request, Request.order_id == Order.order_id)
+        .outerjoin(Transaction, Transaction.Request_id == Request.id)
+        .outerjoin(CallbackMetadatum, CallbackMetadatum.transaction_id == Transaction.id)
+        .order_by(Order.id, Request.id, Transaction.id)
+    )
+    if start_at:
+        query = query.where(Order.created_at >= start_at)
+    if end_before:
+        query = query.where(Order.created_at < end_before)
+    return query
+
+
+def payment_rows(start_at, end_before, fetch_size):
+    """Rows of payment_query, through a server-side cursor.
+
+    Only `fetch_size` rows are held in memory at a time however many rows the
+    range covers.
+    """
+    query = payment_query(start_at, end_before)
+    # A large sorted range can take longer than the web request timeout before
+    # its first FETCH returns. Local to the export's transaction, like SET LOCAL
+    db.session.execute(select(func.set_config('statement_timeout', str(config.EXPORT_STATEMENT_TIMEOUT), True)))
+    result = db.session.execute(query.execution_options(stream_results=True, yield_per=fetch_size))
+    for row in result:
+        yield row._mapping
+
+
+def _format_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(FIELDNAMES)
+    for row in rows:
+        writer.writerow([_format_value(row[name]) for name in FIELDNAMES])
+        # Hand out what has been written so far instead of growing the buffer
+        if buffer.tell() > 65536:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(rows):
+    lines = []
+    size = 0
+    for row in rows:
+        line = json.dumps({name: _format_value(row[name]) for name in FIELDNAMES}, default=str) + '\n'
+        lines.append(line)
+        size += len(line)
+        if size > 65536:
+            yield ''.join(lines)
+            lines.clear()
+            size = 0
+    yield ''.join(lines)
+
+
+def export_payments(data_format, start_at, end_before, fetch_size):
+    rows = payment_rows(start_at, end_before, fetch_size)
+    return iter_csv(rows) if data_format == 'csv' else iter_ndjson(rows)
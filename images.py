@@ -0,0 +1,46 @@
+from models import db, Animal
+from sqlalchemy import func, select
+
+
+def get_image_info(animal_id):
+    """Digest, size and content type of an animal's image.
+
+    Returns None when the animal does not exist or has no image. The values
+    are stored alongside the image when it is written, so the blob is not
+    read here.
+    """
+    row = db.session.execute(
+        select(Animal.image_digest, Animal.image_size, Animal.image_content_type)
+        .where(Animal.id == animal_id, Animal.image_digest.is_not(None))
+    ).first()
+
+    if row is None:
+        return None
+
+    return {
+        "etag": row.image_digest,
+        "size": row.image_size,
+        "content_type": row.image_content_type,
+    }
+
+
+def iter_image_bytes(animal_id, etag, start, stop, chunk_size):
+    """Yield image bytes in [start, stop) one chunk per query, so memory stays flat.
+
+    Animals.image is stored uncompressed (STORAGE EXTERNAL), so each
+    substring() reads only the TOAST chunks it covers. Every chunk is read
+    only while the image still has digest `etag`; if it is replaced mid-stream
+    the body stops short instead of mixing the two versions.
+    """
+    position = start
+    while position < stop:
+        length = min(chunk_size, stop - position)
+        # substring() on bytea is 1-based
+        chunk = db.session.execute(
+            select(func.substring(Animal.image, position + 1, length))
+            .where(Animal.id == animal_id, Animal.image_digest == etag)
+        ).scalar()
+        if not chunk:
+            return
+        yield bytes(chunk)
+        position += length
@@ -0,0 +1,133 @@
+from datetime import datetime
+from models import db, Notification, NotificationCounter
+from pagination import encode_cursor, decode_cursor, keyset_filter, keyset_order
+from reservations import unclaim
+from serializers import serialize_notification
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+INBOX_SORT = '-created_at'
+
+NOTIFICATION_STATUSES = ('pending', 'accepted', 'declined')
+
+
+def add_notification(farmer_id, message, user_id=None, order_id=None):
+    """Add a pending notification and bump the farmer's unread counter in the same transaction."""
+    notification = Notification(
+        farmer_id=farmer_id,
+        user_id=user_id,
+        order_id=order_id,
+        message=message,
+        status='pending',
+        created_at=datetime.utcnow()
+    )
+    db.session.add(notification)
+
+    if farmer_id is not None:
+        db.session.execute(
+            insert(NotificationCounter)
+            .values(user_id=farmer_id, unread=1)
+            .on_conflict_do_update(
+                index_elements=[NotificationCounter.user_id],
+                set_={"unread": NotificationCounter.unread + 1}
+            )
+        )
+    return notification
+
+
+def respond(notification, response):
+    """Move a pending notification to `response`; False if it was already answered."""
+    answered = db.session.execute(
+        update(Notification)
+        .where(Notification.id == notification.id, Notification.status == 'pending')
+        .values(status=response)
+        .execution_options(synchronize_session='fetch')
+    ).rowcount
+
+    if not answered:
+        return False
+
+    db.session.execute(
+        update(NotificationCounter)
+        .where(NotificationCounter.user_id == notification.farmer_id)
+        .values(unread=func.greatest(NotificationCounter.unread - 1, 0))
+    )
+    return True
+
+
+def respond_to_order(notification, response):
+    """Answer an order notification and record the farmer's response on the order.
+
+    A declined order puts the animal back on the market. False if the
+    notification was already answered.
+    """
+    if not respond(notification, response):
+        return False
+
+    order = notification.order
+    order.status = response
+    if response == 'declined':
+        unclaim(order.animal_id, order.user_id)
+    return True
+
+
+def remove_order_notifications(order_id):
+    """Delete the notifications for an order, taking pending ones off the unread counters."""
+    removed = db.session.execute(
+        delete(Notification)
+        .where(Notification.order_id == order_id)
+        .returning(Notification.farmer_id, Notification.status)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    for farmer_id, status in removed:
+        if status == 'pending' and farmer_id is not None:
+            db.session.execute(
+                update(NotificationCounter)
+                .where(NotificationCounter.user_id == farmer_id)
+                .values(unread=func.greatest(NotificationCounter.unread - 1, 0))
+            )
+
+
+def unread_count(user_id):
+    return db.session.scalar(
+        select(NotificationCounter.unread).where(NotificationCounter.user_id == user_id)
+    ) or 0
+
+
+def inbox_query(farmer_id, limit, after=None, status=None):
+    """The SELECT behind one inbox page, fetching `limit` + 1 rows.
+
+    Raises pagination.InvalidCursor for a bad `after`, and ValueError for a
+    `status` that is not one of NOTIFICATION_STATUSES.
+    """
+    if status and status not in NOTIFICATION_STATUSES:
+        raise ValueError(f"status must be one of: {', '.join(NOTIFICATION_STATUSES)}")
+
+    query = (
+        select(Notification.id, Notification.order_id, Notification.message, Notification.status, Notification.created_at)
+        .where(Notification.farmer_id == farmer_id)
+    )
+    if status:
+        query = query.where(Notification.status == status)
+
+    if after:
+        value, last_id = decode_cursor(after, INBOX_SORT)
+        query = query.where(keyset_filter(Notification.created_at, Notification.id, True, value, last_id, cast=datetime.fromisoformat, nullable=False))
+
+    return query.order_by(*keyset_order(Notification.created_at, Notification.id, True, nullable=False)).limit(limit + 1)
+
+
+def list_notifications(farmer_id, limit, after=None, status=None):
+    """One page of a farmer's notifications, newest first, and the next page cursor.
+
+    Raises the same errors as inbox_query.
+    """
+    rows = db.session.execute(inbox_query(farmer_id, limit, after=after, status=status)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(INBOX_SORT, rows[-1].created_at, rows[-1].id)
+
+    return [serialize_notification(row) for row in rows], next_cursor
@@ -0,0 +1,27 @@
+"""Add Orders.created_at index for date-range exports
+
+Revision ID: 0b5d7f3e8a92
+Revises: f3a9c6e2d148
+Create Date: 2026-10-19 11:20:09.402175
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b5d7f3e8a92'
+down_revision = 'f3a9c6e2d148'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index('ix_orders_created_at', 'Orders', ['created_at'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_orders_created_at', table_name='Orders', postgresql_concurrently=True, if_exists=True)
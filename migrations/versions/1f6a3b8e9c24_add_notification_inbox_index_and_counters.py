@@ -0,0 +1,41 @@
+"""Add Notifications (farmer_id, created_at) index and NotificationCounters table
+
+Revision ID: 1f6a3b8e9c24
+Revises: e94b07c2a5f8
+Create Date: 2026-10-18 13:41:09.274518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1f6a3b8e9c24'
+down_revision = 'e94b07c2a5f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_notifications_farmer_id_created_at', 'Notifications', ['farmer_id', 'created_at'], unique=False)
+
+    op.create_table('NotificationCounters',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('unread', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['Users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Seed the counters from the notifications that are still pending
+    op.execute("""
+        INSERT INTO "NotificationCounters" (user_id, unread)
+        SELECT farmer_id, count(*)
+        FROM "Notifications"
+        WHERE status = 'pending' AND farmer_id IS NOT NULL
+        GROUP BY farmer_id
+    """)
+
+
+def downgrade():
+    op.drop_table('NotificationCounters')
+    op.drop_index('ix_notifications_farmer_id_created_at', table_name='Notifications')
@@ -0,0 +1,44 @@
+"""Add indexes for the columns hot routes filter and join on
+
+Revision ID: 3c7e9a1d5f60
+Revises: b6e0d4c8a317
+Create Date: 2026-10-18 20:05:37.618240
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c7e9a1d5f60'
+down_revision = 'b6e0d4c8a317'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, partial index condition)
+INDEXES = [
+    ('ix_cart_user_id_animal_id', 'Cart', ['user_id', 'animal_id'], None),
+    ('ix_orders_user_id', 'Orders', ['user_id'], None),
+    ('ix_requests_checkout_request_id', 'Requests', ['CheckoutRequestID'], None),
+    ('ix_transactions_checkout_request_id', 'Transactions', ['CheckoutRequestID'], None),
+    ('ix_callback_metadata_transaction_id', 'CallbackMetadata', ['transaction_id'], None),
+    ('ix_animals_type_id_breed_id_is_available', 'Animals', ['type_id', 'breed_id', 'is_available'], None),
+    ('ix_animals_reserved_by', 'Animals', ['reserved_by'], sa.text('reserved_by IS NOT NULL')),
+    ('ix_farmers_profile_user_id', 'FarmersProfile', ['user_id'], None),
+    ('ix_users_roles_user_id', 'UsersRoles', ['user_id'], None),
+]
+
+
+def upgrade():
+    # CONCURRENTLY keeps the tables writable while the indexes build; it cannot
+    # run inside the migration transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_where=where,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,36 @@
+"""Add CallbackIntake table for queued M-Pesa callbacks
+
+Revision ID: 5b1e9c04d2a7
+Revises: a93b8e1b222e
+Create Date: 2026-10-18 09:12:41.530217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1e9c04d2a7'
+down_revision = 'a93b8e1b222e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('CallbackIntake',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('CheckoutRequestID', sa.String(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('status', sa.Enum('pending', 'processed', 'duplicate', 'failed', name='callback_intake_status'), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('received_at', sa.DateTime(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_callback_intake_status_id', 'CallbackIntake', ['status', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_callback_intake_status_id', table_name='CallbackIntake')
+    op.drop_table('CallbackIntake')
+    op.execute("DROP TYPE IF EXISTS callback_intake_status")
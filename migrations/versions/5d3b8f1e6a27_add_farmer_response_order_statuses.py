@@ -0,0 +1,34 @@
+"""Add accepted and declined order statuses for farmer responses
+
+Revision ID: 5d3b8f1e6a27
+Revises: 9e4a1f7c3b58
+Create Date: 2026-10-19 18:03:12.551946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d3b8f1e6a27'
+down_revision = '9e4a1f7c3b58'
+branch_labels = None
+depends_on = None
+
+OLD_STATUSES = ('initiated', 'payment_in_progress', 'payment_success', 'payment_failed')
+
+
+def upgrade():
+    # ALTER TYPE ... ADD VALUE cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE order_status ADD VALUE IF NOT EXISTS 'accepted'")
+        op.execute("ALTER TYPE order_status ADD VALUE IF NOT EXISTS 'declined'")
+
+
+def downgrade():
+    # Postgres cannot drop enum values; rebuild the type without them
+    op.execute("""UPDATE "Orders" SET status = 'initiated' WHERE status::text IN ('accepted', 'declined')""")
+    op.execute("ALTER TYPE order_status RENAME TO order_status_old")
+    sa.Enum(*OLD_STATUSES, name='order_status').create(op.get_bind())
+    op.execute('ALTER TABLE "Orders" ALTER COLUMN status TYPE order_status USING status::text::order_status')
+    op.execute("DROP TYPE order_status_old")
@@ -0,0 +1,42 @@
+"""Make Animals.price and Animals.age NOT NULL and index them for keyset pages
+
+Revision ID: 6e2b9d4a1c85
+Revises: 3c7e9a1d5f60
+Create Date: 2026-10-19 09:12:44.908317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e2b9d4a1c85'
+down_revision = '3c7e9a1d5f60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Listings without a price or age cannot be sorted or bought; refuse to
+    # guess values for them
+    missing = op.get_bind().scalar(sa.text('SELECT count(*) FROM "Animals" WHERE price IS NULL OR age IS NULL'))
+    if missing:
+        raise RuntimeError(f"{missing} Animals rows have no price or age; fix them before upgrading")
+
+    op.alter_column('Animals', 'age', existing_type=sa.Integer(), nullable=False)
+    op.alter_column('Animals', 'price', existing_type=sa.Numeric(), nullable=False)
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_animals_price_id', 'Animals', ['price', 'id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_animals_age_id', 'Animals', ['age', 'id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_animals_age_id', table_name='Animals', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_animals_price_id', table_name='Animals', postgresql_concurrently=True, if_exists=True)
+
+    op.alter_column('Animals', 'price', existing_type=sa.Numeric(), nullable=True)
+    op.alter_column('Animals', 'age', existing_type=sa.Integer(), nullable=True)
@@ -0,0 +1,24 @@
+"""Add resolved_at to ReconciliationIssues
+
+Revision ID: 7b2e5c9f4d16
+Revises: 5d3b8f1e6a27
+Create Date: 2026-10-19 19:27:45.108362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e5c9f4d16'
+down_revision = '5d3b8f1e6a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('ReconciliationIssues', sa.Column('resolved_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('ReconciliationIssues', 'resolved_at')
@@ -0,0 +1,32 @@
+"""Add unique constraints on Users.email and Roles.role_name
+
+Revision ID: 7d2c4f9a0b13
+Revises: c3f81a6d7e52
+Create Date: 2026-10-18 11:24:56.407153
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2c4f9a0b13'
+down_revision = 'c3f81a6d7e52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('Users', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_users_email', ['email'])
+
+    with op.batch_alter_table('Roles', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_roles_role_name', ['role_name'])
+
+
+def downgrade():
+    with op.batch_alter_table('Roles', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_roles_role_name', type_='unique')
+
+    with op.batch_alter_table('Users', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_users_email', type_='unique')
@@ -0,0 +1,30 @@
+"""Add reserved_by and reserved_until columns to table Animals
+
+Revision ID: 8a5d2e7f1c90
+Revises: 1f6a3b8e9c24
+Create Date: 2026-10-18 14:36:52.690341
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a5d2e7f1c90'
+down_revision = '1f6a3b8e9c24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('Animals', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reserved_by', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('reserved_until', sa.DateTime(), nullable=True))
+        batch_op.create_foreign_key('fk_animals_reserved_by_users', 'Users', ['reserved_by'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('Animals', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_animals_reserved_by_users', type_='foreignkey')
+        batch_op.drop_column('reserved_until')
+        batch_op.drop_column('reserved_by')
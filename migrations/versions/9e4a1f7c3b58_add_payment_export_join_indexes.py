@@ -0,0 +1,35 @@
+"""Add indexes for the payment export joins
+
+Revision ID: 9e4a1f7c3b58
+Revises: 0b5d7f3e8a92
+Create Date: 2026-10-19 16:42:51.230817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4a1f7c3b58'
+down_revision = '0b5d7f3e8a92'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns)
+INDEXES = [
+    ('ix_requests_order_id', 'Requests', ['order_id']),
+    ('ix_transactions_request_id', 'Transactions', ['Request_id']),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
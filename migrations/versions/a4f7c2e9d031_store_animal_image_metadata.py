@@ -0,0 +1,67 @@
+"""Store digest, size and content type of Animals.image in columns
+
+Revision ID: a4f7c2e9d031
+Revises: 6e2b9d4a1c85
+Create Date: 2026-10-19 09:40:03.551872
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4f7c2e9d031'
+down_revision = '6e2b9d4a1c85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('Animals', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_digest', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('image_size', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('image_content_type', sa.String(), nullable=True))
+
+    # Computed once when the image is written, so serving it (and answering
+    # If-None-Match) never has to read the blob
+    op.execute("""
+        CREATE OR REPLACE FUNCTION animals_image_metadata_update() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.image IS NULL THEN
+                NEW.image_digest := NULL;
+                NEW.image_size := NULL;
+                NEW.image_content_type := NULL;
+                RETURN NEW;
+            END IF;
+            NEW.image_digest := md5(NEW.image);
+            NEW.image_size := length(NEW.image);
+            NEW.image_content_type := CASE
+                WHEN substring(NEW.image FROM 1 FOR 3) = '\\xffd8ff'::bytea THEN 'image/jpeg'
+                WHEN substring(NEW.image FROM 1 FOR 8) = '\\x89504e470d0a1a0a'::bytea THEN 'image/png'
+                WHEN substring(NEW.image FROM 1 FOR 6) IN ('GIF87a'::bytea, 'GIF89a'::bytea) THEN 'image/gif'
+                WHEN substring(NEW.image FROM 1 FOR 4) = 'RIFF'::bytea
+                     AND substring(NEW.image FROM 9 FOR 4) = 'WEBP'::bytea THEN 'image/webp'
+                ELSE 'application/octet-stream'
+            END;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER animals_image_metadata_trigger
+        BEFORE INSERT OR UPDATE OF image ON "Animals"
+        FOR EACH ROW EXECUTE FUNCTION animals_image_metadata_update()
+    """)
+
+    # Backfill existing images through the trigger
+    op.execute('UPDATE "Animals" SET image = image WHERE image IS NOT NULL')
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS animals_image_metadata_trigger ON "Animals"')
+    op.execute("DROP FUNCTION IF EXISTS animals_image_metadata_update()")
+
+    with op.batch_alter_table('Animals', schema=None) as batch_op:
+        batch_op.drop_column('image_content_type')
+        batch_op.drop_column('image_size')
+        batch_op.drop_column('image_digest')
@@ -0,0 +1,49 @@
+"""Add ReconciliationState and ReconciliationIssues tables and a CallbackMetadata receipt index
+
+Revision ID: b6e0d4c8a317
+Revises: 8a5d2e7f1c90
+Create Date: 2026-10-18 15:48:20.553109
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e0d4c8a317'
+down_revision = '8a5d2e7f1c90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ReconciliationState',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('high_water_mark', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('ReconciliationIssues',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.Enum('missing_callback', 'amount_mismatch', 'duplicate_receipt', 'status_mismatch', name='reconciliation_issue_kind'), nullable=True),
+    sa.Column('reference', sa.String(), nullable=False),
+    sa.Column('request_id', sa.Integer(), nullable=True),
+    sa.Column('order_id', sa.String(), nullable=True),
+    sa.Column('expected_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('actual_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('details', sa.Text(), nullable=True),
+    sa.Column('detected_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['request_id'], ['Requests.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('kind', 'reference', name='uq_reconciliation_issues_kind_reference')
+    )
+
+    # The duplicate_receipt check looks receipts up across the whole table
+    op.create_index('ix_callback_metadata_mpesa_receipt_number', 'CallbackMetadata', ['MpesaReceiptNumber'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_callback_metadata_mpesa_receipt_number', table_name='CallbackMetadata')
+    op.drop_table('ReconciliationIssues')
+    op.drop_table('ReconciliationState')
+    op.execute("DROP TYPE IF EXISTS reconciliation_issue_kind")
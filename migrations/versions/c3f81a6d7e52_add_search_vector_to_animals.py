@@ -0,0 +1,89 @@
+"""Add full-text search vector to Animals and trigram indexes on Types/Breeds
+
+Revision ID: c3f81a6d7e52
+Revises: 5b1e9c04d2a7
+Create Date: 2026-10-18 10:02:17.118462
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f81a6d7e52'
+down_revision = '5b1e9c04d2a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.batch_alter_table('Animals', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # Type and breed names live in other tables, so the vector is kept up to
+    # date by a trigger instead of a generated column
+    op.execute("""
+        CREATE OR REPLACE FUNCTION animals_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('english', coalesce((SELECT name FROM "Types" WHERE id = NEW.type_id), '')), 'A') ||
+                setweight(to_tsvector('english', coalesce((SELECT name FROM "Breeds" WHERE id = NEW.breed_id), '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER animals_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF type_id, breed_id, description ON "Animals"
+        FOR EACH ROW EXECUTE FUNCTION animals_search_vector_update()
+    """)
+
+    # Renaming a type or breed re-indexes the animals that use it
+    op.execute("""
+        CREATE OR REPLACE FUNCTION animals_search_vector_refresh() RETURNS trigger AS $$
+        BEGIN
+            IF TG_TABLE_NAME = 'Types' THEN
+                UPDATE "Animals" SET type_id = type_id WHERE type_id = NEW.id;
+            ELSE
+                UPDATE "Animals" SET breed_id = breed_id WHERE breed_id = NEW.id;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER types_search_vector_trigger
+        AFTER UPDATE OF name ON "Types"
+        FOR EACH ROW EXECUTE FUNCTION animals_search_vector_refresh()
+    """)
+    op.execute("""
+        CREATE TRIGGER breeds_search_vector_trigger
+        AFTER UPDATE OF name ON "Breeds"
+        FOR EACH ROW EXECUTE FUNCTION animals_search_vector_refresh()
+    """)
+
+    # Backfill existing listings through the trigger
+    op.execute('UPDATE "Animals" SET description = description')
+
+    op.create_index('ix_animals_search_vector', 'Animals', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_types_name_trgm', 'Types', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_breeds_name_trgm', 'Breeds', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_breeds_name_trgm', table_name='Breeds')
+    op.drop_index('ix_types_name_trgm', table_name='Types')
+    op.drop_index('ix_animals_search_vector', table_name='Animals')
+
+    op.execute('DROP TRIGGER IF EXISTS breeds_search_vector_trigger ON "Breeds"')
+    op.execute('DROP TRIGGER IF EXISTS types_search_vector_trigger ON "Types"')
+    op.execute('DROP TRIGGER IF EXISTS animals_search_vector_trigger ON "Animals"')
+    op.execute("DROP FUNCTION IF EXISTS animals_search_vector_refresh()")
+    op.execute("DROP FUNCTION IF EXISTS animals_search_vector_update()")
+
+    with op.batch_alter_table('Animals', schema=None) as batch_op:
+        batch_op.drop_column('search_vector')
@@ -0,0 +1,56 @@
+"""Add ReferenceVersions, bumped on writes to Types, Breeds and Roles
+
+Revision ID: c5f2a8d6e913
+Revises: e8c1d4a7b352
+Create Date: 2026-10-19 20:48:16.337019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5f2a8d6e913'
+down_revision = 'e8c1d4a7b352'
+branch_labels = None
+depends_on = None
+
+# Cache name (see refcache._LOADERS) -> table
+TABLES = {
+    'types': 'Types',
+    'breeds': 'Breeds',
+    'roles': 'Roles',
+}
+
+
+def upgrade():
+    versions = op.create_table('ReferenceVersions',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(versions, [{'name': name, 'version': 0} for name in TABLES])
+
+    # Statement-level, so a bulk write bumps the version once; any writer,
+    # ORM or not, is seen by every worker's reference cache
+    op.execute("""
+        CREATE OR REPLACE FUNCTION reference_versions_bump() RETURNS trigger AS $$
+        BEGIN
+            UPDATE "ReferenceVersions" SET version = version + 1 WHERE name = TG_ARGV[0];
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for name, table in TABLES.items():
+        op.execute(f"""
+            CREATE TRIGGER {name}_reference_version_trigger
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "{table}"
+            FOR EACH STATEMENT EXECUTE FUNCTION reference_versions_bump('{name}')
+        """)
+
+
+def downgrade():
+    for name, table in TABLES.items():
+        op.execute(f'DROP TRIGGER IF EXISTS {name}_reference_version_trigger ON "{table}"')
+    op.execute("DROP FUNCTION IF EXISTS reference_versions_bump()")
+    op.drop_table('ReferenceVersions')
@@ -0,0 +1,27 @@
+"""Add Animals.breed_id index for name-matched searches
+
+Revision ID: d1c8e5a7b264
+Revises: a4f7c2e9d031
+Create Date: 2026-10-19 10:05:51.230194
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1c8e5a7b264'
+down_revision = 'a4f7c2e9d031'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index('ix_animals_breed_id', 'Animals', ['breed_id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_animals_breed_id', table_name='Animals', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,28 @@
+"""Store Animals.image uncompressed out of line
+
+Revision ID: e8c1d4a7b352
+Revises: 7b2e5c9f4d16
+Create Date: 2026-10-19 20:11:38.906524
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c1d4a7b352'
+down_revision = '7b2e5c9f4d16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Images are already compressed formats; with EXTERNAL, substring() reads
+    # only the TOAST chunks it needs instead of decompressing the whole value
+    op.execute('ALTER TABLE "Animals" ALTER COLUMN image SET STORAGE EXTERNAL')
+    # Only new values use the new storage; rewrite the existing ones
+    op.execute("""UPDATE "Animals" SET image = image || ''::bytea WHERE image IS NOT NULL""")
+
+
+def downgrade():
+    op.execute('ALTER TABLE "Animals" ALTER COLUMN image SET STORAGE EXTENDED')
@@ -0,0 +1,33 @@
+"""Add RevokedTokens table for shared JWT revocation
+
+Revision ID: e94b07c2a5f8
+Revises: 7d2c4f9a0b13
+Create Date: 2026-10-18 12:05:33.861920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e94b07c2a5f8'
+down_revision = '7d2c4f9a0b13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('RevokedTokens',
+    sa.Column('jti', sa.String(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index('ix_revoked_tokens_revoked_at', 'RevokedTokens', ['revoked_at'], unique=False)
+    op.create_index('ix_revoked_tokens_expires_at', 'RevokedTokens', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_revoked_tokens_expires_at', table_name='RevokedTokens')
+    op.drop_index('ix_revoked_tokens_revoked_at', table_name='RevokedTokens')
+    op.drop_table('RevokedTokens')
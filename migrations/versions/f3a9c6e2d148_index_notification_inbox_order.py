@@ -0,0 +1,39 @@
+"""Make Notifications.created_at NOT NULL and index the inbox order
+
+Revision ID: f3a9c6e2d148
+Revises: d1c8e5a7b264
+Create Date: 2026-10-19 10:48:26.771530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9c6e2d148'
+down_revision = 'd1c8e5a7b264'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Undated notifications used to sort last (NULLS LAST); the epoch keeps them there
+    op.execute("""UPDATE "Notifications" SET created_at = '1970-01-01' WHERE created_at IS NULL""")
+    op.alter_column('Notifications', 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_notifications_farmer_id_created_at_id', 'Notifications',
+                        ['farmer_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_notifications_farmer_id_created_at', table_name='Notifications',
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index('ix_notifications_farmer_id_created_at', 'Notifications', ['farmer_id', 'created_at'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_notifications_farmer_id_created_at_id', table_name='Notifications',
+                      postgresql_concurrently=True, if_exists=True)
+
+    op.alter_column('Notifications', 'created_at', existing_type=sa.DateTime(), nullable=True)
@@ -1,8 +1,9 @@
 # coding: utf-8
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import BigInteger, Boolean, Column, DateTime, Enum, ForeignKey, Integer, Numeric, String, Text, LargeBinary
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, JSON, Numeric, String, Text, LargeBinary, UniqueConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 db = SQLAlchemy()
 
@@ -14,6 +15,10 @@ class Role(db.Model):
     description = Column(String)
     created_at = Column(DateTime)
 
+    __table_args__ = (
+        UniqueConstraint('role_name', name='uq_roles_role_name'),
+    )
+
 
 class Type(db.Model):
     __tablename__ = 'Types'
@@ -21,6 +26,10 @@ class Type(db.Model):
     id = Column(Integer, primary_key=True)
     name = Column(String)
 
+    __table_args__ = (
+        Index('ix_types_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
+
 
 class User(db.Model):
     __tablename__ = 'Users'
@@ -33,6 +42,10 @@ class User(db.Model):
     is_verified = Column(Boolean)
     password_reset_token = Column(String)
 
+    __table_args__ = (
+        UniqueConstraint('email', name='uq_users_email'),
+    )
+
 
 class Breed(db.Model):
     __tablename__ = 'Breeds'
@@ -43,6 +56,10 @@ class Breed(db.Model):
 
     type = relationship('Type')
 
+    __table_args__ = (
+        Index('ix_breeds_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
+
 
 class FarmersProfile(db.Model):
     __tablename__ = 'FarmersProfile'
@@ -54,6 +71,10 @@ class FarmersProfile(db.Model):
 
     user = relationship('User')
 
+    __table_args__ = (
+        Index('ix_farmers_profile_user_id', 'user_id'),
+    )
+
 
 class UsersRole(db.Model):
     __tablename__ = 'UsersRoles'
@@ -66,6 +87,10 @@ class UsersRole(db.Model):
     role = relationship('Role')
     user = relationship('User')
 
+    __table_args__ = (
+        Index('ix_users_roles_user_id', 'user_id'),
+    )
+
 
 class Animal(db.Model):
     __tablename__ = 'Animals'
@@ -74,16 +99,39 @@ class Animal(db.Model):
     farmer_id = Column(ForeignKey('FarmersProfile.id'))
     type_id = Column(ForeignKey('Types.id'))
     breed_id = Column(ForeignKey('Breeds.id'))
-    age = Column(Integer)
-    price = Column(Numeric)
+    age = Column(Integer, nullable=False)
+    price = Column(Numeric, nullable=False)
     description = Column(Text)
     is_available = Column(Boolean)
-    image = Column(LargeBinary)
+    # Short-lived hold while the animal sits in a buyer's cart (see reservations.py)
+    reserved_by = Column(ForeignKey('Users.id'))
+    reserved_until = Column(DateTime)
+    # Deferred so catalogue queries never pull the blob; served by GET /animals/<id>/image.
+    # STORAGE EXTERNAL (see migration e8c1d4a7b352) lets ranged reads skip decompressing it
+    image = deferred(Column(LargeBinary))
+    # Filled in by a database trigger whenever image is written
+    image_digest = Column(String)
+    image_size = Column(Integer)
+    image_content_type = Column(String)
+    # Maintained by a database trigger from type, breed and description
+    search_vector = deferred(Column(TSVECTOR))
 
     breed = relationship('Breed')
     farmer = relationship('FarmersProfile')
     type = relationship('Type')
 
+    __table_args__ = (
+        Index('ix_animals_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('ix_animals_type_id_breed_id_is_available', 'type_id', 'breed_id', 'is_available'),
+        # With the index above, lets searches OR type and breed matches into one bitmap scan
+        Index('ix_animals_breed_id', 'breed_id'),
+        # Keyset pages sorted by price or age (see catalogue.SORT_KEYS)
+        Index('ix_animals_price_id', 'price', 'id'),
+        Index('ix_animals_age_id', 'age', 'id'),
+        # Only held animals, for releasing a buyer's holds
+        Index('ix_animals_reserved_by', 'reserved_by', postgresql_where=reserved_by.is_not(None)),
+    )
+
 
 class Cart(db.Model):
     __tablename__ = 'Cart'
@@ -96,6 +144,10 @@ class Cart(db.Model):
     animal = relationship('Animal')
     user = relationship('User')
 
+    __table_args__ = (
+        Index('ix_cart_user_id_animal_id', 'user_id', 'animal_id'),
+    )
+
 
 class Order(db.Model):
     __tablename__ = 'Orders'
@@ -105,12 +157,20 @@ class Order(db.Model):
     animal_id = Column(ForeignKey('Animals.id'))
     order_id = Column(String, unique=True)
     quantity = Column(Integer)
-    status = Column(Enum('initiated', 'payment_in_progress', 'payment_success', 'payment_failed', name='order_status'))
+    # accepted and declined are the farmer's response to the order notification
+    status = Column(Enum('initiated', 'payment_in_progress', 'payment_success', 'payment_failed', 'accepted', 'declined',
+                         name='order_status'))
     created_at = Column(DateTime)
 
     animal = relationship('Animal')
     user = relationship('User')
 
+    __table_args__ = (
+        Index('ix_orders_user_id', 'user_id'),
+        # Date-range payment exports
+        Index('ix_orders_created_at', 'created_at'),
+    )
+
 
 class Request(db.Model):
     __tablename__ = 'Requests'
@@ -128,6 +188,12 @@ class Request(db.Model):
     order = db.relationship('Order')
     user = db.relationship('User')
 
+    __table_args__ = (
+        Index('ix_requests_checkout_request_id', 'CheckoutRequestID'),
+        # Payment export joins
+        Index('ix_requests_order_id', 'order_id'),
+    )
+
 
 class Transaction(db.Model):
     __tablename__ = 'Transactions'
@@ -142,6 +208,11 @@ class Transaction(db.Model):
 
     Request = relationship('Request')
 
+    __table_args__ = (
+        Index('ix_transactions_checkout_request_id', 'CheckoutRequestID'),
+        Index('ix_transactions_request_id', 'Request_id'),
+    )
+
 
 class CallbackMetadatum(db.Model):
     __tablename__ = 'CallbackMetadata'
@@ -156,6 +227,12 @@ class CallbackMetadatum(db.Model):
 
     transaction = relationship('Transaction')
 
+    __table_args__ = (
+        Index('ix_callback_metadata_transaction_id', 'transaction_id'),
+        # Duplicate-receipt checks in reconciliation.py
+        Index('ix_callback_metadata_mpesa_receipt_number', 'MpesaReceiptNumber'),
+    )
+
 class Notification(db.Model):
     __tablename__ = 'Notifications'
 
@@ -165,8 +242,88 @@ class Notification(db.Model):
     order_id = Column(ForeignKey('Orders.id'))
     message = Column(Text)
     status = Column(Enum('pending', 'accepted', 'declined', name='notification_status'), default='pending')
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     user = relationship('User', foreign_keys=[user_id])
     farmer = relationship('User', foreign_keys=[farmer_id])
     order = relationship('Order')
+
+    __table_args__ = (
+        # Matches the inbox ORDER BY (see inbox.list_notifications), so pages need no sort
+        Index('ix_notifications_farmer_id_created_at_id', 'farmer_id', created_at.desc(), id.desc()),
+    )
+
+
+class NotificationCounter(db.Model):
+    __tablename__ = 'NotificationCounters'
+
+    # Pending notifications per user, maintained on insert and on response
+    user_id = Column(ForeignKey('Users.id'), primary_key=True)
+    unread = Column(Integer, nullable=False, default=0)
+
+
+class CallbackIntake(db.Model):
+    __tablename__ = 'CallbackIntake'
+
+    id = Column(Integer, primary_key=True)
+    CheckoutRequestID = Column(String)
+    payload = Column(JSON)
+    status = Column(Enum('pending', 'processed', 'duplicate', 'failed', name='callback_intake_status'), default='pending')
+    error = Column(Text)
+    received_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime)
+
+    __table_args__ = (
+        Index('ix_callback_intake_status_id', 'status', 'id'),
+    )
+
+
+class ReferenceVersion(db.Model):
+    __tablename__ = 'ReferenceVersions'
+
+    # Bumped by triggers on every write to Types, Breeds and Roles, so each
+    # worker's reference cache can tell when its copy is stale
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+class RevokedToken(db.Model):
+    __tablename__ = 'RevokedTokens'
+
+    jti = Column(String, primary_key=True)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_revoked_tokens_revoked_at', 'revoked_at'),
+        Index('ix_revoked_tokens_expires_at', 'expires_at'),
+    )
+
+
+class ReconciliationState(db.Model):
+    __tablename__ = 'ReconciliationState'
+
+    # Highest Requests.id a reconciliation job has fully processed
+    name = Column(String, primary_key=True)
+    high_water_mark = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime)
+
+
+class ReconciliationIssue(db.Model):
+    __tablename__ = 'ReconciliationIssues'
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(Enum('missing_callback', 'amount_mismatch', 'duplicate_receipt', 'status_mismatch', name='reconciliation_issue_kind'))
+    reference = Column(String, nullable=False)  # CheckoutRequestID, or the receipt number for duplicates
+    request_id = Column(ForeignKey('Requests.id'))
+    order_id = Column(String)
+    expected_amount = Column(Numeric(10, 2))
+    actual_amount = Column(Numeric(10, 2))
+    details = Column(Text)
+    detected_at = Column(DateTime, default=datetime.utcnow)
+    # Set when a later run finds the issue gone, e.g. a callback that arrived late
+    resolved_at = Column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint('kind', 'reference', name='uq_reconciliation_issues_kind_reference'),
+    )
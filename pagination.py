@@ -0,0 +1,92 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import and_, or_, tuple_
+
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def parse_limit(value, default, maximum):
+    """Read a `limit` query parameter, clamped to the server-side cap."""
+    if value is None or value == '':
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit <= 0:
+        raise ValueError("limit must be greater than 0")
+    return min(limit, maximum)
+
+
+def encode_cursor(sort, value, row_id):
+    if isinstance(value, Decimal):
+        value = str(value)
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({"s": sort, "v": value, "id": row_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """Decode an opaque cursor, making sure it was issued for the same sort."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data["s"] != sort or not isinstance(data["id"], int):
+            raise InvalidCursor("Cursor does not match the requested sort")
+        return data["v"], data["id"]
+    except InvalidCursor:
+        raise
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def keyset_order(column, id_column, descending, nullable=True):
+    """ORDER BY for a keyset page.
+
+    NOT NULL columns get plain ASC/DESC so a (column, id) btree index, read
+    forwards or backwards, gives the order without a sort.
+    """
+    if column is id_column:
+        return [id_column.desc() if descending else id_column.asc()]
+    if not nullable:
+        if descending:
+            return [column.desc(), id_column.desc()]
+        return [column.asc(), id_column.asc()]
+    if descending:
+        return [column.desc().nulls_last(), id_column.desc()]
+    return [column.asc().nulls_last(), id_column.asc()]
+
+
+def keyset_filter(column, id_column, descending, value, row_id, cast=None, nullable=True):
+    """Rows strictly after (value, row_id) in the order given by keyset_order.
+
+    NULLs sort last in both directions, so once the cursor reaches them only the
+    id tie-break is left. For NOT NULL columns the filter is a single row-value
+    comparison, which Postgres uses as an index condition on (column, id).
+    """
+    if column is id_column:
+        return id_column < row_id if descending else id_column > row_id
+
+    if value is None:
+        id_after = id_column < row_id if descending else id_column > row_id
+        return and_(column.is_(None), id_after)
+
+    if cast is not None:
+        try:
+            value = cast(value)
+        except (TypeError, ValueError, InvalidOperation):
+            raise InvalidCursor("Invalid cursor")
+
+    if descending:
+        after = tuple_(column, id_column) < tuple_(value, row_id)
+    else:
+        after = tuple_(column, id_column) > tuple_(value, row_id)
+    if not nullable:
+        return after
+    return or_(after, column.is_(None))
@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from functools import lru_cache
+from werkzeug.security import generate_password_hash, check_password_hash
+
+try:
+    from eventlet import patcher, tpool
+except ImportError:
+    patcher = tpool = None
+
+config = Config()
+
+# pbkdf2 is CPU-bound; running it inline would block the eventlet hub and stall
+# every other green thread on the worker. hashlib releases the GIL while it
+# hashes, so native threads also let logins run in parallel.
+_executor = ThreadPoolExecutor(max_workers=config.PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash')
+
+
+def _run(func, *args):
+    if patcher is not None and patcher.is_monkey_patched('thread'):
+        # Monkey-patched threads are green, use eventlet's pool of real OS
+        # threads instead (sized by EVENTLET_THREADPOOL_SIZE)
+        return tpool.execute(func, *args)
+
+    return _executor.submit(func, *args).result()
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password, config.PASSWORD_HASH_METHOD, config.PASSWORD_SALT_LENGTH)
+
+
+def verify_password(password_hash, password):
+    if not password_hash:
+        return False
+    return _run(check_password_hash, password_hash, password)
+
+
+@lru_cache(maxsize=None)
+def _configured_method():
+    # The "method" prefix werkzeug writes for PASSWORD_HASH_METHOD, with its
+    # defaults filled in (e.g. "scrypt" -> "scrypt:32768:8:1"); worked out once
+    # per process from a throwaway hash
+    return hash_password('').split('$', 1)[0]
+
+
+def needs_rehash(password_hash):
+    """True when a stored hash was made with other settings than PASSWORD_HASH_METHOD."""
+    return password_hash.split('$', 1)[0] != _configured_method()
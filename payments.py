@@ -0,0 +1,233 @@
+from config import Config
+from datetime import datetime
+from models import db, Request
+from utils import get_mpesa_token, clear_mpesa_token
+
+import atexit
+import daraja
+import os
+import queue
+import threading
+import time
+import uuid
+
+config = Config()
+
+STK_PUSH_URL = f"{daraja.DARAJA_BASE_URL}/mpesa/stkpush/v1/processrequest"
+
+_STOP = object()
+
+
+class QueueFull(Exception):
+    pass
+
+
+class PaymentQueue:
+    """Bounded in-process queue that sends STK pushes from background workers.
+
+    Routes enqueue a payload and get a handle back straight away; the status of
+    each handle is kept in memory until it has been finished for `result_ttl`
+    seconds. Worker threads start on the first submit(), so CLI commands and a
+    preloading master process never run them.
+    """
+
+    def __init__(self, workers, max_depth, result_ttl):
+        self.app = None
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue(maxsize=max_depth)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+        self._accepting = False
+        self._started_pid = None
+
+    def init_app(self, app):
+        self.app = app
+        self._accepting = True
+        atexit.register(self.shutdown)
+
+    def _ensure_started(self):
+        # Threads do not survive a fork; a worker forked after start gets its own
+        if self._started_pid == os.getpid():
+            return
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            self._threads = []
+            for _ in range(self.workers):
+                thread = threading.Thread(target=self._run, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            self._started_pid = os.getpid()
+
+    def submit(self, user_id, order_id, payload):
+        if not self._accepting:
+            raise QueueFull("Payment queue is shutting down")
+        self._ensure_started()
+
+        handle = uuid.uuid4().hex
+        job = {
+            "handle": handle,
+            "status": "queued",
+            "user_id": user_id,
+            "order_id": order_id,
+            "result": None,
+            "error": None,
+            "created_at": datetime.now(),
+            "finished_at": None,
+        }
+        with self._lock:
+            self._prune()
+            self._jobs[handle] = job
+        try:
+            self._queue.put_nowait((handle, payload))
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(handle, None)
+            raise QueueFull("Payment queue is full")
+        return handle
+
+    def status(self, handle):
+        with self._lock:
+            job = self._jobs.get(handle)
+            return dict(job) if job else None
+
+    def persisted_status(self, user_id, order_id):
+        """Status of the latest STK push saved for the order, for handles another worker issued."""
+        request_row = (
+            Request.query
+            .filter_by(user_id=user_id, order_id=order_id)
+            .order_by(Request.id.desc())
+            .first()
+        )
+        if request_row is None:
+            return None
+        return {
+            "status": "submitted",
+            "order_id": request_row.order_id,
+            "result": {
+                "MerchantRequestID": request_row.MerchantRequestID,
+                "CheckoutRequestID": request_row.CheckoutRequestID,
+                "ResponseCode": request_row.ResponseCode,
+                "ResponseDescription": request_row.ResponseDescription,
+                "CustomerMessage": request_row.CustomerMessage,
+            },
+            "error": None,
+            "created_at": request_row.created_at,
+        }
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def shutdown(self, drain=True, timeout=30):
+        """Stop accepting work. With `drain`, wait for queued pushes to be sent."""
+        if not self._accepting:
+            return
+        self._accepting = False
+        if self._started_pid != os.getpid():
+            # No workers in this process
+            return
+        if not drain:
+            # Throw away what has not started yet
+            while True:
+                try:
+                    handle, _ = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._finish(handle, "failed", error="Payment queue shut down before processing")
+                self._queue.task_done()
+        deadline = time.monotonic() + timeout
+        for _ in self._threads:
+            remaining = max(deadline - time.monotonic(), 0)
+            try:
+                self._queue.put(_STOP, timeout=remaining)
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                handle, payload = item
+                self._process(handle, payload)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, handle, payload):
+        self._update(handle, status="processing")
+        job = self.status(handle)
+
+        try:
+            headers = {
+                "Authorization": "Bearer {}".format(get_mpesa_token())
+            }
+            response = daraja.post("stk_push", STK_PUSH_URL, json=payload, headers=headers)
+        except Exception as e:
+            self._finish(handle, "failed", error=str(e))
+            return
+
+        # The cached OAuth token was rejected, drop it so the next call fetches a new one
+        if response.status_code == 401:
+            clear_mpesa_token()
+
+        try:
+            response_data = response.json()
+        except ValueError:
+            response_data = {"error": response.text}
+
+        if response.status_code != 200:
+            self._finish(handle, "failed", result=response_data, error="Safaricom rejected the payment request")
+            return
+
+        with self.app.app_context():
+            try:
+                new_request = Request(
+                    order_id=job["order_id"],
+                    user_id=job["user_id"],
+                    MerchantRequestID=response_data.get("MerchantRequestID"),
+                    CheckoutRequestID=response_data.get("CheckoutRequestID"),
+                    ResponseCode=response_data.get("ResponseCode"),
+                    ResponseDescription=response_data.get("ResponseDescription"),
+                    CustomerMessage=response_data.get("CustomerMessage"),
+                    created_at=datetime.now()
+                )
+                db.session.add(new_request)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                self._finish(handle, "failed", result=response_data, error=str(e))
+                return
+            finally:
+                db.session.remove()
+
+        self._finish(handle, "submitted", result=response_data)
+
+    def _update(self, handle, **fields):
+        with self._lock:
+            job = self._jobs.get(handle)
+            if job:
+                job.update(fields)
+
+    def _finish(self, handle, status, result=None, error=None):
+        self._update(handle, status=status, result=result, error=error, finished_at=time.monotonic())
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.result_ttl
+        expired = [
+            handle for handle, job in self._jobs.items()
+            if job["finished_at"] is not None and job["finished_at"] < cutoff
+        ]
+        for handle in expired:
+            del self._jobs[handle]
+
+
+payment_queue = PaymentQueue(
+    workers=config.PAYMENT_WORKERS,
+    max_depth=config.PAYMENT_QUEUE_SIZE,
+    result_ttl=config.PAYMENT_RESULT_TTL,
+)
@@ -0,0 +1,105 @@
+from catalogue import listing_query
+from datetime import datetime
+from decimal import Decimal
+from exports import payment_query
+from inbox import INBOX_SORT, inbox_query
+from models import db, Animal, Cart, FarmersProfile, Order, Request, Transaction, User, UsersRole
+from pagination import encode_cursor
+from sqlalchemy import func, select, text
+
+# A later page of each keyset sort, with a representative cursor
+_AFTER = {
+    'id': encode_cursor('id', 1000, 1000),
+    'price': encode_cursor('price', Decimal('15000'), 1000),
+    '-price': encode_cursor('-price', Decimal('15000'), 1000),
+    'age': encode_cursor('age', 2, 1000),
+    '-age': encode_cursor('-age', 2, 1000),
+}
+
+# name -> (query builder, whether it is a LIMIT-ed keyset page). The builders
+# are the ones the routes use, with representative arguments; keyset pages
+# must come straight off an index, without a Sort.
+HOT_QUERIES = {
+    'login': (lambda: User.query.filter_by(email='buyer@example.com').statement, False),
+    'cart_item': (lambda: Cart.query.filter_by(user_id=1, animal_id=1).statement, False),
+    'list_orders': (lambda: Order.query.filter_by(user_id=1).statement, False),
+    'callback_transactions': (lambda: (
+        select(Transaction.CheckoutRequestID)
+        .where(Transaction.CheckoutRequestID.in_(['ws_CO_1', 'ws_CO_2']))
+    ), False),
+    'callback_requests': (lambda: (
+        select(Request.CheckoutRequestID, func.min(Request.id))
+        .where(Request.CheckoutRequestID.in_(['ws_CO_1', 'ws_CO_2']))
+        .group_by(Request.CheckoutRequestID)
+    ), False),
+    'catalogue_first_page': (lambda: listing_query(20), True),
+    **{
+        f'catalogue_page_sort={sort}': (lambda sort=sort: listing_query(20, sort=sort, after=_AFTER[sort]), True)
+        for sort in _AFTER
+    },
+    'catalogue_by_type': (lambda: listing_query(20, animal_type='cattle', after=_AFTER['id']), True),
+    'catalogue_search': (lambda: listing_query(20, sort='relevance', search_text='friesian heifer'), False),
+    'inbox_first_page': (lambda: inbox_query(1, 20), True),
+    'inbox_page': (lambda: inbox_query(1, 20, after=encode_cursor(INBOX_SORT, datetime(2024, 11, 1), 1000)), True),
+    'inbox_pending': (lambda: inbox_query(1, 20, status='pending'), True),
+    'payment_export_month': (lambda: payment_query(datetime(2024, 11, 1), datetime(2024, 12, 1)), False),
+    'release_holds': (lambda: select(Animal.id).where(Animal.reserved_by == 1, Animal.is_available.is_(True)), False),
+    'farmer_profile': (lambda: FarmersProfile.query.filter_by(user_id=1).statement, False),
+    'user_roles': (lambda: UsersRole.query.filter(UsersRole.user_id == 1, UsersRole.role_id.in_([1, 2])).statement, False),
+}
+
+_INDEX_SCANS = ('Index Scan', 'Index Only Scan')
+
+
+def _is_empty(node):
+    # A filter Postgres proved false, e.g. a type name no Type matches
+    return node['Node Type'] == 'Result' and node.get('One-Time Filter') == 'false'
+
+
+def _problems(node, keyset, under_limit=False):
+    node_type = node['Node Type']
+    under_limit = under_limit or node_type == 'Limit'
+
+    if node_type == 'Seq Scan':
+        yield f"sequential scan on {node['Relation Name']}"
+    elif node_type in _INDEX_SCANS and 'Index Cond' not in node and not under_limit:
+        # Walks the whole index; only fine when a LIMIT stops it early
+        yield f"full index scan of {node['Index Name']}"
+    elif keyset and node_type in ('Sort', 'Incremental Sort') and not all(map(_is_empty, node['Plans'])):
+        yield f"{node_type.lower()} on {', '.join(node.get('Sort Key', []))}"
+
+    for child in node.get('Plans', []):
+        yield from _problems(child, keyset, under_limit)
+
+
+def explain(query, keyset=False):
+    """The JSON plan of `query`, with sequential scans disabled.
+
+    With enable_seqscan off, a small local database gets the plan a large one
+    would, so a scan that remains means no index can serve the query. For
+    keyset pages sorting is disabled too: a Sort that remains means no index
+    returns the rows in page order. Runs on the session's connection, inside a
+    savepoint that is rolled back to undo the settings.
+    """
+    connection = db.session.connection()
+    savepoint = connection.begin_nested()
+    try:
+        connection.execute(text("SET LOCAL enable_seqscan = off"))
+        if keyset:
+            connection.execute(text("SET LOCAL enable_sort = off"))
+        compiled = query.compile(connection, compile_kwargs={"render_postcompile": True})
+        plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    finally:
+        savepoint.rollback()
+    return plan[0]['Plan']
+
+
+def check_plan(name):
+    """Problems found in the plan of the hot query `name`."""
+    build, keyset = HOT_QUERIES[name]
+    return list(_problems(explain(build(), keyset), keyset))
+
+
+def check_plans():
+    """{query name: problems found in its plan} for every hot query."""
+    return {name: check_plan(name) for name in HOT_QUERIES}
@@ -0,0 +1,98 @@
+from config import Config
+from socketio import PubSubManager
+
+import logging
+import queue
+import threading
+
+config = Config()
+logger = logging.getLogger(__name__)
+
+
+class LocalQueueManager(PubSubManager):
+    """In-process stand-in for a Redis/Kombu message queue.
+
+    Every manager on the same channel receives every published message, so
+    several Socket.IO servers in one process behave like workers sharing a
+    real queue. Meant for tests and local development.
+    """
+
+    name = 'local'
+    _subscribers = {}
+    _subscribers_lock = threading.Lock()
+
+    def __init__(self, channel='socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self._inbox = queue.Queue()
+        with self._subscribers_lock:
+            self._subscribers.setdefault(channel, []).append(self._inbox)
+
+    def _publish(self, data):
+        with self._subscribers_lock:
+            inboxes = list(self._subscribers.get(self.channel, []))
+        for inbox in inboxes:
+            inbox.put(data)
+
+    def _listen(self):
+        while True:
+            yield self._inbox.get()
+
+
+def socketio_options():
+    """Keyword arguments for SocketIO() so emits from any worker reach every worker."""
+    url = config.SOCKETIO_MESSAGE_QUEUE
+    if not url:
+        return {}
+    if url.startswith('local://'):
+        return {"client_manager": LocalQueueManager(channel=url[len('local://'):] or 'socketio')}
+    return {"message_queue": url, "channel": config.SOCKETIO_CHANNEL}
+
+
+class NotificationBatcher:
+    """Coalesces notifications per room and emits them on a short interval.
+
+    A burst of messages for one room becomes a single socket event carrying
+    the latest message, up to `max_messages` recent messages and the total
+    count.
+    """
+
+    def __init__(self, socketio, interval, max_messages):
+        self.socketio = socketio
+        self.interval = interval
+        self.max_messages = max_messages
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._task = None
+
+    def enqueue(self, event, room, message):
+        with self._lock:
+            batch = self._pending.setdefault((event, room), {"messages": [], "count": 0})
+            batch["messages"].append(message)
+            del batch["messages"][:-self.max_messages]
+            batch["count"] += 1
+            if self._task is None:
+                self._task = self.socketio.start_background_task(self._run)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for (event, room), batch in pending.items():
+            try:
+                self.socketio.emit(event, {
+                    'message': batch["messages"][-1],
+                    'messages': batch["messages"],
+                    'count': batch["count"]
+                }, to=room)
+            except Exception:
+                # e.g. the message queue is unreachable; the other rooms still get theirs
+                logger.exception("Could not emit %s to %s, dropped %d messages", event, room, batch["count"])
+
+    def _run(self):
+        try:
+            while True:
+                self.socketio.sleep(self.interval)
+                self.flush()
+        finally:
+            # Let the next enqueue() start a fresh task if this one ever dies
+            with self._lock:
+                self._task = None
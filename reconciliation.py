@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta
+from models import (db, Animal, CallbackIntake, CallbackMetadatum, Order, ReconciliationIssue, ReconciliationState, Request,
+                    Transaction)
+from sqlalchemy import and_, cast, exists, func, literal, or_, select, String, update
+from sqlalchemy.dialects.postgresql import insert
+
+JOB_NAME = 'payments'
+
+ISSUE_COLUMNS = ['kind', 'reference', 'request_id', 'order_id', 'expected_amount', 'actual_amount', 'details', 'detected_at']
+
+
+def _record(query):
+    """INSERT ... SELECT the issues found by `query`; issues already on file are skipped."""
+    result = db.session.execute(
+        insert(ReconciliationIssue)
+        .from_select(ISSUE_COLUMNS, query)
+        .on_conflict_do_nothing(constraint='uq_reconciliation_issues_kind_reference')
+    )
+    return result.rowcount
+
+
+def _missing_callbacks(window, now):
+    # Anti-join: STK pushes Safaricom never called back about
+    return (
+        select(
+            literal('missing_callback'), Request.CheckoutRequestID, Request.id, Request.order_id,
+            literal(None), literal(None), literal('No callback received'), literal(now)
+        )
+        .where(window, Request.CheckoutRequestID.is_not(None))
+        .where(~exists().where(Transaction.CheckoutRequestID == Request.CheckoutRequestID))
+    )
+
+
+def _amount_mismatches(window, now):
+    # Paid amount against what the order is worth (animal price x quantity)
+    expected = Animal.price * Order.quantity
+    return (
+        select(
+            literal('amount_mismatch'), Request.CheckoutRequestID, Request.id, Request.order_id,
+            expected, CallbackMetadatum.Amount, literal('Paid amount differs from order total'), literal(now)
+        )
+        .select_from(Request)
+        .join(Transaction, Transaction.CheckoutRequestID == Request.CheckoutRequestID)
+        .join(CallbackMetadatum, CallbackMetadatum.transaction_id == Transaction.id)
+        .join(Order, Order.order_id == Request.order_id)
+        .join(Animal, Animal.id == Order.animal_id)
+        .where(window, CallbackMetadatum.Amount != expected)
+    )
+
+
+def _duplicate_receipts(window, now):
+    # Receipts in this window that appear more than once anywhere in the table
+    window_receipts = (
+        select(CallbackMetadatum.MpesaReceiptNumber)
+        .join(Transaction, Transaction.id == CallbackMetadatum.transaction_id)
+        .join(Request, Request.CheckoutRequestID == Transaction.CheckoutRequestID)
+        .where(window, CallbackMetadatum.MpesaReceiptNumber.is_not(None))
+    )
+    counted = (
+        select(
+            CallbackMetadatum.MpesaReceiptNumber.label('receipt'),
+            CallbackMetadatum.Amount.label('amount'),
+            func.count().over(partition_by=CallbackMetadatum.MpesaReceiptNumber).label('copies'),
+            func.row_number().over(partition_by=CallbackMetadatum.MpesaReceiptNumber, order_by=CallbackMetadatum.id).label('position')
+        )
+        .where(CallbackMetadatum.MpesaReceiptNumber.in_(window_receipts))
+        .subquery()
+    )
+    return (
+        select(
+            literal('duplicate_receipt'), counted.c.receipt, literal(None), literal(None),
+            literal(None), counted.c.amount,
+            literal('Receipt recorded ') + cast(counted.c.copies, String) + literal(' times'),
+            literal(now)
+        )
+        .where(counted.c.copies > 1, counted.c.position == 1)
+    )
+
+
+def _status_mismatches(window, now):
+    # Order status that disagrees with the payment outcome
+    paid = Transaction.ResultCode == '0'
+    return (
+        select(
+            literal('status_mismatch'), Request.CheckoutRequestID, Request.id, Request.order_id,
+            literal(None), literal(None),
+            literal('Result code ') + Transaction.ResultCode + literal(', order status ') + cast(Order.status, String),
+            literal(now)
+        )
+        .select_from(Request)
+        .join(Transaction, Transaction.CheckoutRequestID == Request.CheckoutRequestID)
+        .join(Order, Order.order_id == Request.order_id)
+        .where(window)
+        .where(or_(
+            and_(paid, Order.status.in_(['initiated', 'payment_in_progress', 'payment_failed'])),
+            and_(~paid, Order.status == 'payment_success')
+        ))
+    )
+
+
+CHECKS = {
+    'missing_callback': _missing_callbacks,
+    'amount_mismatch': _amount_mismatches,
+    'duplicate_receipt': _duplicate_receipts,
+    'status_mismatch': _status_mismatches,
+}
+
+
+def resolve_missing_callbacks():
+    """Resolve open missing_callback issues whose callback has since been processed.
+
+    Returns how many were resolved.
+    """
+    resolved = db.session.execute(
+        update(ReconciliationIssue)
+        .where(
+            ReconciliationIssue.kind == 'missing_callback',
+            ReconciliationIssue.resolved_at.is_(None),
+            exists().where(Transaction.CheckoutRequestID == ReconciliationIssue.reference)
+        )
+        .values(resolved_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return resolved
+
+
+def _last_settled_request(grace_minutes):
+    # Requests.created_at is written with local time (datetime.now), so the
+    # grace cutoff must be too
+    cutoff = datetime.now() - timedelta(minutes=grace_minutes)
+    upper = db.session.scalar(select(func.max(Request.id)).where(Request.created_at < cutoff)) or 0
+
+    # A callback still queued in CallbackIntake is not missing; stop short of
+    # the first request that has one so it is checked once it is processed
+    queued = db.session.scalar(
+        select(func.min(Request.id))
+        .join(CallbackIntake, CallbackIntake.CheckoutRequestID == Request.CheckoutRequestID)
+        .where(CallbackIntake.status == 'pending', Request.id <= upper)
+    )
+    return upper if queued is None else queued - 1
+
+
+def reconcile(grace_minutes, chunk_size, full=False):
+    """Check payment requests created since the last run.
+
+    Requests are handled in id ranges of `chunk_size`; each range's findings
+    and the new high-water mark are committed together, so an interrupted
+    run resumes where it stopped. Requests younger than `grace_minutes`, and
+    any from the first one whose callback is still queued, are left for the
+    next run because their callback may still be on its way.
+    Yields (first id, last id, {check: issues found}) per range.
+    """
+    now = datetime.utcnow()
+
+    # Concurrent first runs both see no row; only one insert goes through
+    db.session.execute(
+        insert(ReconciliationState)
+        .values(name=JOB_NAME, high_water_mark=0, updated_at=now)
+        .on_conflict_do_nothing(index_elements=[ReconciliationState.name])
+    )
+    state = db.session.get(ReconciliationState, JOB_NAME, with_for_update=True, populate_existing=True)
+    if full:
+        state.high_water_mark = 0
+
+    upper = _last_settled_request(grace_minutes)
+
+    while state.high_water_mark < upper:
+        first = state.high_water_mark + 1
+        last = min(state.high_water_mark + chunk_size, upper)
+        window = Request.id.between(first, last)
+
+        found = {name: _record(check(window, now)) for name, check in CHECKS.items()}
+
+        state.high_water_mark = last
+        state.updated_at = now
+        db.session.commit()
+        yield first, last, found
+
+        # Keep the row locked against a concurrent run for the next range
+        state = db.session.get(ReconciliationState, JOB_NAME, with_for_update=True, populate_existing=True)
+
+    db.session.commit()
@@ -0,0 +1,152 @@
+from config import Config
+from models import db, Breed, ReferenceVersion, Role, Type
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+import threading
+import time
+
+config = Config()
+
+# Loaders for each cached table; rows are kept as plain dicts so they can be
+# shared across sessions and threads
+_LOADERS = {
+    'types': lambda: [
+        {"id": row.id, "name": row.name}
+        for row in db.session.execute(select(Type.id, Type.name))
+    ],
+    'breeds': lambda: [
+        {"id": row.id, "type_id": row.type_id, "name": row.name}
+        for row in db.session.execute(select(Breed.id, Breed.type_id, Breed.name))
+    ],
+    'roles': lambda: [
+        {"id": row.id, "role_name": row.role_name, "description": row.description}
+        for row in db.session.execute(select(Role.id, Role.role_name, Role.description))
+    ],
+}
+
+_MODEL_TABLES = {
+    Type: 'types',
+    Breed: 'breeds',
+    Role: 'roles',
+}
+
+
+class ReferenceCache:
+    """Per-worker cache of the Types, Breeds and Roles tables.
+
+    Each table is reloaded after `ttl` seconds, as soon as a write to it is
+    committed through the ORM in this worker, or when a check of
+    ReferenceVersions, at most every `check_interval` seconds, shows another
+    worker wrote to it.
+    """
+
+    def __init__(self, ttl, check_interval):
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._next_check = 0.0
+        self._seen_versions = {}
+        self._tables = {}
+        self._versions = {name: 0 for name in _LOADERS}
+        self._hits = {name: 0 for name in _LOADERS}
+        self._misses = {name: 0 for name in _LOADERS}
+        self._lock = threading.Lock()
+
+    def _check_versions(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+
+        versions = dict(db.session.execute(select(ReferenceVersion.name, ReferenceVersion.version)).all())
+        changed = [name for name, version in versions.items()
+                   if name in _LOADERS and self._seen_versions.get(name) != version]
+        self._seen_versions.update(versions)
+        if changed:
+            self.invalidate(*changed)
+
+    def rows(self, name):
+        self._check_versions()
+        entry = self._tables.get(name)
+        if entry and entry["version"] == self._versions[name] and time.monotonic() < entry["expires_at"]:
+            self._hits[name] += 1
+            return entry["rows"]
+
+        with self._lock:
+            entry = self._tables.get(name)
+            if entry and entry["version"] == self._versions[name] and time.monotonic() < entry["expires_at"]:
+                self._hits[name] += 1
+                return entry["rows"]
+
+            self._misses[name] += 1
+            version = self._versions[name]
+            rows = _LOADERS[name]()
+            self._tables[name] = {
+                "version": version,
+                "expires_at": time.monotonic() + self.ttl,
+                "rows": rows,
+            }
+            return rows
+
+    def invalidate(self, *names):
+        with self._lock:
+            for name in names or _LOADERS:
+                self._versions[name] += 1
+                self._tables.pop(name, None)
+
+    def stats(self):
+        return {
+            name: {
+                "version": self._versions[name],
+                "hits": self._hits[name],
+                "misses": self._misses[name],
+            }
+            for name in _LOADERS
+        }
+
+    # Lookups used by the routes
+
+    def type_names(self):
+        return {row["id"]: row["name"] for row in self.rows('types')}
+
+    def breed_names(self):
+        return {row["id"]: row["name"] for row in self.rows('breeds')}
+
+    def matching_type_ids(self, text):
+        """Ids of types whose name contains `text`, case-insensitively."""
+        text = text.lower()
+        return [row["id"] for row in self.rows('types') if row["name"] and text in row["name"].lower()]
+
+    def matching_breed_ids(self, text):
+        text = text.lower()
+        return [row["id"] for row in self.rows('breeds') if row["name"] and text in row["name"].lower()]
+
+    def role_id(self, role_name):
+        for row in self.rows('roles'):
+            if row["role_name"] == role_name:
+                return row["id"]
+        return None
+
+
+reference_cache = ReferenceCache(ttl=config.REFERENCE_CACHE_TTL, check_interval=config.REFERENCE_CACHE_CHECK_SECONDS)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_reference_writes(session, flush_context):
+    touched = session.info.setdefault('reference_cache_dirty', set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        name = _MODEL_TABLES.get(type(instance))
+        if name:
+            touched.add(name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_reference_writes(session):
+    touched = session.info.pop('reference_cache_dirty', None)
+    if touched:
+        reference_cache.invalidate(*touched)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_reference_writes(session):
+    session.info.pop('reference_cache_dirty', None)
@@ -0,0 +1,57 @@
+from datetime import datetime
+from models import db, FarmersProfile, Role, User, UsersRole
+from refcache import reference_cache
+from sqlalchemy.exc import IntegrityError
+
+# Unique constraints that registration relies on instead of pre-check SELECTs
+USERS_EMAIL_CONSTRAINT = 'uq_users_email'
+ROLES_NAME_CONSTRAINT = 'uq_roles_role_name'
+
+
+class UserExists(Exception):
+    pass
+
+
+def _violated_constraint(error):
+    diag = getattr(error.orig, 'diag', None)
+    return getattr(diag, 'constraint_name', None)
+
+
+def register_user(email, username, password_hash, role_name, role_description, profile=None):
+    """Create a user, link it to a role and optionally create a farmer profile.
+
+    Everything is written in one transaction with a single commit, so a failure
+    leaves nothing behind. Raises UserExists when the email is already taken.
+    """
+    for attempt in range(2):
+        # Resolved before the user is added: a cold cache queries Roles, and
+        # that query would autoflush a pending duplicate outside the try below
+        role_id = reference_cache.role_id(role_name)
+
+        try:
+            user = User(email=email, username=username, password_hash=password_hash, is_verified=False)
+            db.session.add(user)
+
+            if role_id:
+                user_role = UsersRole(user=user, role_id=role_id, created_at=datetime.utcnow())
+            else:
+                # First user with this role; the role row goes in the same transaction
+                role = Role(role_name=role_name, description=role_description, created_at=datetime.utcnow())
+                user_role = UsersRole(user=user, role=role, created_at=datetime.utcnow())
+            db.session.add(user_role)
+
+            if profile is not None:
+                db.session.add(FarmersProfile(user=user, **profile))
+
+            db.session.commit()
+            return user
+        except IntegrityError as e:
+            db.session.rollback()
+            constraint = _violated_constraint(e)
+            if constraint == USERS_EMAIL_CONSTRAINT:
+                raise UserExists(email)
+            if constraint == ROLES_NAME_CONSTRAINT and attempt == 0:
+                # Another sign-up created the role first, reload and retry once
+                reference_cache.invalidate('roles')
+                continue
+            raise
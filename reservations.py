@@ -0,0 +1,116 @@
+from datetime import timedelta
+from models import db, Animal, FarmersProfile
+from sqlalchemy import func, or_, select, update
+
+
+# Arbitrary key for the per-user advisory lock taken while placing a hold
+_HOLD_LOCK_KEY = 7261002
+
+
+class AnimalUnavailable(Exception):
+    pass
+
+
+class TooManyHolds(Exception):
+    pass
+
+
+def _db_now():
+    # Database clock in UTC, so every worker agrees on when a hold expires
+    return func.timezone('utc', func.now())
+
+
+def _not_held_by_others(user_id):
+    return or_(
+        Animal.reserved_until.is_(None),
+        Animal.reserved_until < _db_now(),
+        Animal.reserved_by == user_id
+    )
+
+
+def active_holds(user_id, exclude_animal_id=None):
+    query = (
+        select(func.count())
+        .select_from(Animal)
+        .where(Animal.reserved_by == user_id, Animal.reserved_until >= _db_now(), Animal.is_available.is_(True))
+    )
+    if exclude_animal_id is not None:
+        query = query.where(Animal.id != exclude_animal_id)
+    return db.session.scalar(query)
+
+
+def reserve(animal_id, user_id, hold_seconds, max_holds):
+    """Hold an available animal for `user_id`, e.g. while it sits in their cart.
+
+    A single conditional UPDATE: it succeeds only if nobody else holds an
+    unexpired reservation, so concurrent buyers cannot both get it. Renewing
+    your own hold extends it. Returns False if the animal is taken, and
+    raises TooManyHolds if the user already holds `max_holds` other animals.
+    """
+    # Taken until the transaction ends, so concurrent requests from one user
+    # cannot each pass the cap below
+    db.session.execute(select(func.pg_advisory_xact_lock(_HOLD_LOCK_KEY, user_id)))
+    if active_holds(user_id, exclude_animal_id=animal_id) >= max_holds:
+        raise TooManyHolds(user_id)
+
+    held = db.session.execute(
+        update(Animal)
+        .where(Animal.id == animal_id, Animal.is_available.is_(True), _not_held_by_others(user_id))
+        .values(reserved_by=user_id, reserved_until=_db_now() + timedelta(seconds=hold_seconds))
+        .returning(Animal.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    return held is not None
+
+
+def claim(animal_id, user_id):
+    """Take an animal off the market for an order, in one round trip.
+
+    Returns the farmer's user id. Raises AnimalUnavailable when the animal is
+    missing, sold or held by another buyer.
+    """
+    farmer_user_id = (
+        select(FarmersProfile.user_id)
+        .where(FarmersProfile.id == Animal.farmer_id)
+        .scalar_subquery()
+    )
+    row = db.session.execute(
+        update(Animal)
+        .where(Animal.id == animal_id, Animal.is_available.is_(True), _not_held_by_others(user_id))
+        .values(is_available=False, reserved_by=user_id, reserved_until=None)
+        .returning(Animal.id, farmer_user_id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        raise AnimalUnavailable(animal_id)
+    return row[1]
+
+
+def unclaim(animal_id, user_id):
+    """Put an animal claimed by `user_id` back on the market, e.g. when their order is cancelled or declined."""
+    db.session.execute(
+        update(Animal)
+        .where(Animal.id == animal_id, Animal.reserved_by == user_id, Animal.is_available.is_(False))
+        .values(is_available=True, reserved_by=None, reserved_until=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def release(animal_id, user_id):
+    """Drop the user's hold on an animal that has not been ordered."""
+    db.session.execute(
+        update(Animal)
+        .where(Animal.id == animal_id, Animal.reserved_by == user_id, Animal.is_available.is_(True))
+        .values(reserved_by=None, reserved_until=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def release_all(user_id):
+    """Drop every hold the user has on animals that have not been ordered."""
+    db.session.execute(
+        update(Animal)
+        .where(Animal.reserved_by == user_id, Animal.is_available.is_(True))
+        .values(reserved_by=None, reserved_until=None)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,164 @@
+from collections import OrderedDict
+from config import Config
+from flask import Response, current_app, request
+from functools import wraps
+
+import hashlib
+import json
+import threading
+import time
+
+config = Config()
+
+
+class MemoryBackend:
+    """Per-worker LRU of cached responses.
+
+    Invalidation only reaches this worker; others serve their copy until it
+    is RESPONSE_CACHE_TTL seconds old.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, namespace):
+        return self._generations.get(namespace, 0)
+
+    def bump(self, namespace):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+
+class RedisBackend:
+    """Cache shared by every worker; invalidating in one worker applies to all.
+
+    Entries are Redis hashes of the raw body plus JSON-encoded headers, so
+    nothing read back from Redis is ever unpickled or executed.
+    """
+
+    def __init__(self, url, prefix='farmart:responses:'):
+        # Only needed when the shared backend is configured
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        fields = self._client.hgetall(self.prefix + key)
+        if not fields:
+            return None
+        return fields[b'body'], int(fields[b'status']), json.loads(fields[b'headers']), fields[b'etag'].decode()
+
+    def set(self, key, value, ttl):
+        body, status, headers, etag = value
+        with self._client.pipeline() as pipe:
+            pipe.hset(self.prefix + key, mapping={
+                'body': body,
+                'status': status,
+                'headers': json.dumps(headers),
+                'etag': etag,
+            })
+            pipe.expire(self.prefix + key, ttl)
+            pipe.execute()
+
+    def generation(self, namespace):
+        return int(self._client.get(f"{self.prefix}generation:{namespace}") or 0)
+
+    def bump(self, namespace):
+        self._client.incr(f"{self.prefix}generation:{namespace}")
+
+
+class ResponseCache:
+    """Caches GET responses per namespace, with strong ETags and 304 handling.
+
+    Writes call invalidate(namespace), which moves the namespace to a new
+    generation so every older entry stops being served.
+    """
+
+    # Response headers worth keeping alongside the body
+    KEPT_HEADERS = ('Content-Type', 'X-Next-Cursor')
+
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, namespace):
+        self.backend.bump(namespace)
+
+    def _key(self, namespace):
+        args = sorted(request.args.items(multi=True))
+        query = '&'.join(f"{name}={value}" for name, value in args)
+        return f"{namespace}:{self.backend.generation(namespace)}:{request.path}?{query}"
+
+    def _respond(self, body, status, headers, etag):
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, status=status, headers=headers)
+        response.set_etag(etag)
+        # Clients may keep a copy but must revalidate it with If-None-Match
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def cached(self, namespace):
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                key = self._key(namespace)
+
+                entry = self.backend.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    return self._respond(*entry)
+
+                self.misses += 1
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+                body = response.get_data()
+                headers = {name: response.headers[name] for name in self.KEPT_HEADERS if name in response.headers}
+                etag = hashlib.sha256(body).hexdigest()[:32]
+                entry = (body, response.status_code, headers, etag)
+                self.backend.set(key, entry, self.ttl)
+                return self._respond(*entry)
+
+            return decorated_function
+        return decorator
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def _create_backend():
+    if config.RESPONSE_CACHE_URL:
+        return RedisBackend(config.RESPONSE_CACHE_URL)
+    return MemoryBackend(config.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(_create_backend(), ttl=config.RESPONSE_CACHE_TTL)
@@ -0,0 +1,181 @@
+from config import Config
+from datetime import datetime, timedelta
+from models import db, RevokedToken
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+import hashlib
+import math
+import threading
+import time
+
+config = Config()
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings. No false negatives, tunable false positives."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.sha256(value.encode()).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:16], 'big') | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class MemoryRevocationStore:
+    """Revoked JTIs for a single process. Only suitable for one worker or tests."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            self._entries[jti] = (expires_at, datetime.utcnow())
+
+    def is_revoked(self, jti):
+        entry = self._entries.get(jti)
+        return entry is not None and entry[0] > datetime.utcnow()
+
+    def revoked_since(self, since):
+        now = datetime.utcnow()
+        return [jti for jti, (expires_at, revoked_at) in list(self._entries.items())
+                if revoked_at >= since and expires_at > now]
+
+    def active(self):
+        return self.revoked_since(datetime.min)
+
+    def purge_expired(self):
+        now = datetime.utcnow()
+        with self._lock:
+            expired = [jti for jti, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for jti in expired:
+                del self._entries[jti]
+        return len(expired)
+
+
+class DatabaseRevocationStore:
+    """Revoked JTIs in the RevokedTokens table, shared by every worker."""
+
+    def add(self, jti, expires_at):
+        db.session.execute(
+            insert(RevokedToken)
+            .values(jti=jti, expires_at=expires_at, revoked_at=datetime.utcnow())
+            .on_conflict_do_nothing(index_elements=['jti'])
+        )
+        db.session.commit()
+
+    def is_revoked(self, jti):
+        return db.session.execute(
+            select(RevokedToken.jti).where(RevokedToken.jti == jti, RevokedToken.expires_at > datetime.utcnow())
+        ).first() is not None
+
+    def revoked_since(self, since):
+        return list(db.session.scalars(
+            select(RevokedToken.jti).where(RevokedToken.revoked_at >= since, RevokedToken.expires_at > datetime.utcnow())
+        ))
+
+    def active(self):
+        return list(db.session.scalars(
+            select(RevokedToken.jti).where(RevokedToken.expires_at > datetime.utcnow())
+        ))
+
+    def purge_expired(self):
+        result = db.session.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+        db.session.commit()
+        return result.rowcount
+
+
+class RevocationList:
+    """Revocation checks backed by a store, with a local bloom filter in front.
+
+    A JTI that is not in the bloom filter has not been revoked, so most checks
+    do no I/O at all. The filter picks up revocations made by other workers
+    every `sync_interval` seconds and is rebuilt from the store's unexpired
+    entries every `rebuild_interval` seconds, which drops expired tokens.
+    """
+
+    def __init__(self, store, capacity, sync_interval, rebuild_interval):
+        self.store = store
+        self.capacity = capacity
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self._bloom = None
+        self._synced_at = 0.0
+        self._rebuilt_at = 0.0
+        self._sync_watermark = datetime.min
+        self._lock = threading.Lock()
+
+    def revoke(self, jti, exp=None):
+        if exp is not None:
+            expires_at = datetime.utcfromtimestamp(exp)
+        else:
+            expires_at = datetime.utcnow() + timedelta(seconds=config.REVOCATION_DEFAULT_TTL)
+        self.store.add(jti, expires_at)
+        if self._bloom is not None:
+            self._bloom.add(jti)
+
+    def is_revoked(self, jti):
+        self._refresh()
+        if jti not in self._bloom:
+            return False
+        return self.store.is_revoked(jti)
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._bloom is not None and now - self._synced_at < self.sync_interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if self._bloom is not None and now - self._synced_at < self.sync_interval:
+                return
+
+            # Overlap the watermark so revocations written with a slightly
+            # different clock on another worker are not missed
+            started = datetime.utcnow() - timedelta(seconds=config.REVOCATION_SYNC_OVERLAP)
+
+            if self._bloom is None or now - self._rebuilt_at >= self.rebuild_interval or self._bloom.count > self.capacity:
+                active = self.store.active()
+                bloom = BloomFilter(max(self.capacity, len(active) * 2))
+                for jti in active:
+                    bloom.add(jti)
+                self._bloom = bloom
+                self._rebuilt_at = now
+            else:
+                for jti in self.store.revoked_since(self._sync_watermark):
+                    self._bloom.add(jti)
+
+            self._sync_watermark = started
+            self._synced_at = now
+
+
+def _create_store():
+    if config.REVOCATION_BACKEND == 'memory':
+        return MemoryRevocationStore()
+    if config.REVOCATION_BACKEND == 'database':
+        return DatabaseRevocationStore()
+    raise ValueError(f"Unknown REVOCATION_BACKEND: {config.REVOCATION_BACKEND}")
+
+
+revocation_list = RevocationList(
+    _create_store(),
+    capacity=config.REVOCATION_BLOOM_CAPACITY,
+    sync_interval=config.REVOCATION_SYNC_INTERVAL,
+    rebuild_interval=config.REVOCATION_BLOOM_REBUILD_INTERVAL,
+)
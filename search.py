@@ -0,0 +1,52 @@
+from models import db, Animal, Breed, Type
+from sqlalchemy import case, func, literal, or_, select
+
+# Text search configuration used by the Animals.search_vector trigger
+SEARCH_CONFIG = 'english'
+
+
+def _similar_names(q):
+    """{'type': {id: similarity}, 'breed': {id: similarity}} for names trigram-similar to q.
+
+    Types and Breeds are small and their names have trigram indexes, so this
+    is one cheap query however many listings there are.
+    """
+    rows = db.session.execute(
+        select(literal('type').label('kind'), Type.id, func.similarity(Type.name, q).label('score'))
+        .where(Type.name.op('%')(q))
+        .union_all(
+            select(literal('breed'), Breed.id, func.similarity(Breed.name, q))
+            .where(Breed.name.op('%')(q))
+        )
+    ).all()
+
+    similar = {'type': {}, 'breed': {}}
+    for row in rows:
+        similar[row.kind][row.id] = row.score
+    return similar
+
+
+def search_clause(q):
+    """Filter and relevance expression for a free-text animal search.
+
+    Full-text matches on the indexed search vector are combined with
+    listings whose type or breed name is trigram-similar to q, so
+    misspellings still find results. The names are resolved to ids first, so
+    the filter only touches Animals and each branch is index-backed (GIN on
+    search_vector, btree on type_id and breed_id).
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    similar = _similar_names(q)
+
+    branches = [Animal.search_vector.op('@@')(tsquery)]
+    name_scores = []
+    for kind, column in (('type', Animal.type_id), ('breed', Animal.breed_id)):
+        if similar[kind]:
+            branches.append(column.in_(list(similar[kind])))
+            name_scores.append(case(similar[kind], value=column, else_=0.0))
+
+    rank = func.ts_rank(Animal.search_vector, tsquery)
+    if name_scores:
+        rank = rank + func.greatest(*name_scores, literal(0.0))
+
+    return or_(*branches), rank
@@ -0,0 +1,116 @@
+from config import Config
+from datetime import date, datetime
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+from operator import attrgetter
+
+import json
+import orjson
+
+config = Config()
+
+
+def _default(o):
+    # The types orjson does not encode natively; datetimes are ISO 8601 as in exports and cursors
+    if isinstance(o, Decimal):
+        return str(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _stdlib_default(o):
+    if isinstance(o, (date, datetime)):
+        return o.isoformat()
+    return _default(o)
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Encodes Decimal as a string and datetime as ISO 8601, the same as
+    StdlibProvider, so switching JSON_PROVIDER changes speed, not output.
+    """
+
+    mimetype = 'application/json'
+    # None: indented when the app is in debug mode, like Flask's default provider
+    compact = None
+
+    def _option(self):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # orjson takes no json.dumps arguments (sort_keys, indent, ...)
+            kwargs.setdefault('default', _stdlib_default)
+            return json.dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._option()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Straight to bytes, skipping the str round trip of JSONProvider.response
+        body = orjson.dumps(obj, default=_default, option=self._option() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class StdlibProvider(DefaultJSONProvider):
+    """Flask's default provider with ISO 8601 datetimes instead of HTTP dates."""
+
+    sort_keys = False
+    default = staticmethod(_stdlib_default)
+
+
+PROVIDERS = {
+    'orjson': OrjsonProvider,
+    'stdlib': StdlibProvider,
+}
+
+
+def init_json(app):
+    """Install the provider named by JSON_PROVIDER on `app`."""
+    app.json = PROVIDERS[config.JSON_PROVIDER](app)
+
+
+def make_serializer(name, fields):
+    """Build `name(obj) -> dict` reading `fields` as attributes of obj.
+
+    A field is an attribute name, or a (key, attribute) pair to rename it.
+    One attrgetter fetches every attribute in a single C call; it works on
+    ORM objects and on Row results alike.
+    """
+    pairs = [(field, field) if isinstance(field, str) else field for field in fields]
+    keys = tuple(key for key, _ in pairs)
+    getter = attrgetter(*(attribute for _, attribute in pairs))
+
+    if len(keys) == 1:
+        def serializer(obj):
+            return {keys[0]: getter(obj)}
+    else:
+        def serializer(obj):
+            return dict(zip(keys, getter(obj)))
+
+    serializer.__name__ = serializer.__qualname__ = name
+    serializer.fields = keys
+    return serializer
+
+
+serialize_animal = make_serializer('serialize_animal', (
+    'id', 'farmer_id', 'type_id', 'breed_id', 'age', 'price', 'description', 'is_available'
+))
+serialize_order = make_serializer('serialize_order', (
+    'id', 'order_id', 'user_id', 'animal_id', 'quantity', 'status', 'created_at'
+))
+serialize_notification = make_serializer('serialize_notification', (
+    'id', 'order_id', 'message', 'status', 'created_at'
+))
+serialize_cart_item = make_serializer('serialize_cart_item', (
+    'animal_id', 'animal_name', 'price_per_item', 'quantity', 'total_price'
+))
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db  # noqa: E402
+
+# A Postgres database upgraded with `flask db upgrade`; tests never commit
+TEST_DATABASE_URI = os.getenv("TEST_DATABASE_URI")
+
+
+@pytest.fixture
+def app():
+    if not TEST_DATABASE_URI:
+        pytest.skip("TEST_DATABASE_URI is not set")
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = TEST_DATABASE_URI
+    db.init_app(app)
+    with app.app_context():
+        yield app
+        db.session.rollback()
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def count_queries(app):
+    """Run a callable and return how many statements it sent to the database."""
+    from sqlalchemy import event
+
+    def run(func, *args, **kwargs):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            func(*args, **kwargs)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        return len(statements)
+
+    return run
@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+import pytest
+
+from catalogue import get_animal_details, list_animals
+from models import db, Animal, Breed, Type
+from refcache import reference_cache
+
+
+@pytest.fixture
+def listings(app):
+    """Add `count` listings of one type and breed, flushed but never committed."""
+    def add(count):
+        animal_type = Type(name='Cattle')
+        db.session.add(animal_type)
+        db.session.flush()
+        breed = Breed(name='Friesian', type_id=animal_type.id)
+        db.session.add(breed)
+        db.session.flush()
+
+        animals = [
+            Animal(type_id=animal_type.id, breed_id=breed.id, age=2, price=Decimal('15000'),
+                   description='Heifer', is_available=True)
+            for _ in range(count)
+        ]
+        db.session.add_all(animals)
+        db.session.flush()
+        # Reload Types and Breeds from this session's uncommitted rows
+        reference_cache.invalidate()
+        return animals
+
+    return add
+
+
+def _listing_queries(count_queries, limit, **filters):
+    # The first call fills the reference cache; only the second is measured
+    list_animals(limit, **filters)
+    return count_queries(list_animals, limit, **filters)
+
+
+@pytest.mark.parametrize('filters', [{}, {'animal_type': 'cattle'}, {'sort': '-price'}])
+def test_list_animals_query_count_does_not_depend_on_page_size(listings, count_queries, filters):
+    listings(50)
+
+    one = _listing_queries(count_queries, 1, **filters)
+    fifty = _listing_queries(count_queries, 50, **filters)
+
+    assert one == fifty == 1
+
+
+def test_list_animals_returns_every_listing_from_one_query(listings, count_queries):
+    listings(50)
+    list_animals(50)
+
+    pages = []
+    assert count_queries(lambda: pages.append(list_animals(50))) == 1
+    animals, _ = pages[0]
+    assert len(animals) == 50 and all(animal['breed'] for animal in animals)
+
+
+def test_get_animal_details_is_one_query(listings, count_queries):
+    animal = listings(1)[0]
+    get_animal_details(animal.id)
+
+    assert count_queries(get_animal_details, animal.id) == 1
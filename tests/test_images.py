@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+import pytest
+
+from images import get_image_info, iter_image_bytes
+from models import db, Animal
+
+PNG = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 64
+
+
+@pytest.fixture
+def animal(app):
+    animal = Animal(age=2, price=Decimal('15000'), description='Heifer', is_available=True, image=PNG)
+    db.session.add(animal)
+    db.session.flush()
+    return animal
+
+
+def test_iter_image_bytes_streams_the_requested_range(animal):
+    info = get_image_info(animal.id)
+    assert info['size'] == len(PNG) and info['content_type'] == 'image/png'
+
+    assert b''.join(iter_image_bytes(animal.id, info['etag'], 0, info['size'], 1000)) == PNG
+    assert b''.join(iter_image_bytes(animal.id, info['etag'], 100, 5000, 1000)) == PNG[100:5000]
+
+
+def test_iter_image_bytes_stops_when_the_image_is_replaced(animal):
+    info = get_image_info(animal.id)
+    chunks = iter_image_bytes(animal.id, info['etag'], 0, info['size'], 1000)
+    first = next(chunks)
+
+    animal.image = PNG[::-1]
+    db.session.flush()
+
+    # Never mixes bytes of the new image into the old one
+    assert first == PNG[:1000] and list(chunks) == []
@@ -0,0 +1,51 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from inbox import add_notification, respond_to_order, unread_count
+from models import db, Animal, Order, User
+from reservations import claim
+
+
+@pytest.fixture
+def placed_order(app):
+    """A buyer's order for a claimed animal and the farmer's pending notification."""
+    farmer = User(email='farmer@example.com', username='farmer', password_hash='x', is_verified=True)
+    buyer = User(email='buyer@example.com', username='buyer', password_hash='x', is_verified=True)
+    animal = Animal(age=2, price=Decimal('15000'), description='Heifer', is_available=True)
+    db.session.add_all([farmer, buyer, animal])
+    db.session.flush()
+
+    claim(animal.id, buyer.id)
+    order = Order(user_id=buyer.id, animal_id=animal.id, order_id='ORD-TEST', quantity=1,
+                  status='initiated', created_at=datetime.now())
+    db.session.add(order)
+    db.session.flush()
+    notification = add_notification(farmer.id, 'New order', user_id=buyer.id, order_id=order.id)
+    db.session.flush()
+    return farmer, animal, order, notification
+
+
+@pytest.mark.parametrize('response', ['accepted', 'declined'])
+def test_respond_to_order_records_the_response(placed_order, response):
+    farmer, animal, order, notification = placed_order
+    assert unread_count(farmer.id) == 1
+
+    assert respond_to_order(notification, response)
+    db.session.flush()
+
+    db.session.refresh(order)
+    db.session.refresh(animal)
+    assert order.status == response
+    assert unread_count(farmer.id) == 0
+    # Only a declined order puts the animal back on the market
+    assert animal.is_available == (response == 'declined')
+
+
+def test_respond_to_order_only_answers_once(placed_order):
+    farmer, _, _, notification = placed_order
+
+    assert respond_to_order(notification, 'accepted')
+    assert not respond_to_order(notification, 'declined')
+    assert unread_count(farmer.id) == 0
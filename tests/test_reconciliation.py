@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, CallbackIntake, ReconciliationIssue, ReconciliationState, Request, Transaction
+from reconciliation import JOB_NAME, reconcile, resolve_missing_callbacks
+
+
+@pytest.fixture
+def no_commit(app, monkeypatch):
+    # reconcile commits per range; flushing instead keeps its writes in the test transaction
+    monkeypatch.setattr(db.session, 'commit', db.session.flush)
+
+
+def _request(checkout_id):
+    # Stamped the way payments.py stamps them, an hour back so it is past the grace period
+    request = Request(CheckoutRequestID=checkout_id, created_at=datetime.now() - timedelta(hours=1))
+    db.session.add(request)
+    db.session.flush()
+    return request
+
+
+def _issues(kind):
+    return {issue.reference: issue for issue in ReconciliationIssue.query.filter_by(kind=kind)}
+
+
+def test_late_callback_resolves_the_missing_callback_issue(no_commit):
+    _request('ws_CO_late')
+    list(reconcile(grace_minutes=5, chunk_size=1_000_000))
+    assert _issues('missing_callback')['ws_CO_late'].resolved_at is None
+
+    db.session.add(Transaction(CheckoutRequestID='ws_CO_late', ResultCode='0'))
+    db.session.flush()
+
+    assert resolve_missing_callbacks() == 1
+    assert _issues('missing_callback')['ws_CO_late'].resolved_at is not None
+
+
+def test_queued_callback_is_not_reported_missing(no_commit):
+    _request('ws_CO_missing')
+    queued = _request('ws_CO_queued')
+    db.session.add(CallbackIntake(CheckoutRequestID='ws_CO_queued', payload={}, status='pending'))
+    db.session.flush()
+
+    list(reconcile(grace_minutes=5, chunk_size=1_000_000))
+
+    missing_callbacks = _issues('missing_callback')
+    assert 'ws_CO_missing' in missing_callbacks and 'ws_CO_queued' not in missing_callbacks
+    # Stops short of the queued request, so the next run checks it again
+    assert db.session.get(ReconciliationState, JOB_NAME).high_water_mark == queued.id - 1
@@ -0,0 +1,21 @@
+from sqlalchemy import insert
+
+from models import db, Type
+from refcache import ReferenceCache
+
+
+def test_writes_from_other_workers_are_picked_up_before_the_ttl(app):
+    cache = ReferenceCache(ttl=300, check_interval=0)
+    assert 'Camel' not in cache.type_names().values()
+
+    # A Core insert stands in for another worker: no ORM commit reaches this cache
+    db.session.execute(insert(Type).values(name='Camel'))
+
+    assert 'Camel' in cache.type_names().values()
+
+
+def test_versions_are_checked_at_most_every_check_interval(app, count_queries):
+    cache = ReferenceCache(ttl=300, check_interval=60)
+    cache.type_names()
+
+    assert count_queries(cache.type_names) == 0
@@ -0,0 +1,33 @@
+import pytest
+
+from models import db, User, UsersRole
+from refcache import reference_cache
+from registration import UserExists, register_user
+
+
+@pytest.fixture
+def no_commit(app, monkeypatch):
+    # register_user commits; flushing instead keeps its writes in the test transaction
+    monkeypatch.setattr(db.session, 'commit', db.session.flush)
+
+
+@pytest.mark.parametrize('role_name, profile', [
+    ('buyer', None),
+    ('farmer', {'farm_name': 'Green Acres', 'location': 'Nakuru'}),
+])
+def test_duplicate_email_on_a_cold_role_cache_raises_user_exists(no_commit, role_name, profile):
+    db.session.add(User(email='taken@example.com', username='first', password_hash='x', is_verified=False))
+    db.session.flush()
+    reference_cache.invalidate('roles')
+
+    with pytest.raises(UserExists):
+        register_user('taken@example.com', 'second', 'x', role_name, role_name.title(), profile=profile)
+
+
+def test_register_user_creates_the_role_with_the_first_user(no_commit):
+    reference_cache.invalidate('roles')
+
+    user = register_user('new@example.com', 'new', 'x', 'auditor', 'Auditor')
+
+    user_roles = UsersRole.query.filter_by(user_id=user.id).all()
+    assert [user_role.role.role_name for user_role in user_roles] == ['auditor']
@@ -0,0 +1,46 @@
+from decimal import Decimal
+
+import pytest
+
+from models import db, Animal, User
+from reservations import AnimalUnavailable, claim, unclaim
+
+
+@pytest.fixture
+def buyers(app):
+    users = [User(email=f'buyer{i}@example.com', username=f'buyer{i}', password_hash='x', is_verified=True)
+             for i in range(2)]
+    db.session.add_all(users)
+    db.session.flush()
+    return [user.id for user in users]
+
+
+@pytest.fixture
+def animal(app):
+    animal = Animal(age=2, price=Decimal('15000'), description='Heifer', is_available=True)
+    db.session.add(animal)
+    db.session.flush()
+    return animal
+
+
+def test_unclaim_puts_a_claimed_animal_back_on_the_market(buyers, animal):
+    first, second = buyers
+    claim(animal.id, first)
+    with pytest.raises(AnimalUnavailable):
+        claim(animal.id, second)
+
+    unclaim(animal.id, first)
+
+    db.session.refresh(animal)
+    assert animal.is_available and animal.reserved_by is None
+    claim(animal.id, second)
+
+
+def test_unclaim_ignores_other_buyers(buyers, animal):
+    first, second = buyers
+    claim(animal.id, first)
+
+    unclaim(animal.id, second)
+
+    db.session.refresh(animal)
+    assert not animal.is_available and animal.reserved_by == first
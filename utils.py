@@ -3,32 +3,55 @@ from datetime import datetime
 from flask import request, g
 from functools import wraps
 from flask_jwt_extended import decode_token
+from collections import OrderedDict
 from requests.auth import HTTPBasicAuth
+from revocation import revocation_list
 
 import base64
-import requests
+import daraja
+import hashlib
+import threading
+import time
 
 config = Config()
 
+# Process-wide cache for the M-Pesa OAuth token. Safaricom tokens live for about
+# an hour, so we keep the last one and only go back to the OAuth endpoint when it
+# is close to expiring.
+_mpesa_token = {"value": None, "expires_at": 0.0}
+_mpesa_token_lock = threading.Lock()
+
+
 def create_access_token():
-    mpesa_auth_url = 'https://sandbox.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials'
-    data = (requests.get(mpesa_auth_url, auth = HTTPBasicAuth(config.CONSUMER_KEY, config.CONSUMER_SECRET))).json()
-    return data['access_token']
+    mpesa_auth_url = config.MPESA_AUTH_URL
+    data = daraja.get("oauth", mpesa_auth_url, auth = HTTPBasicAuth(config.CONSUMER_KEY, config.CONSUMER_SECRET)).json()
+    return data['access_token'], int(data.get('expires_in', 3599))
 
 
-# Custom decorator to run middleware before specific routes
-def generate_token(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        token = create_access_token()
+def get_mpesa_token():
+    # Fast path: a valid token is already cached
+    now = time.monotonic()
+    if _mpesa_token["value"] and now < _mpesa_token["expires_at"]:
+        return _mpesa_token["value"]
+
+    # Single-flight: only one caller fetches, the rest wait and reuse its token
+    with _mpesa_token_lock:
+        now = time.monotonic()
+        if _mpesa_token["value"] and now < _mpesa_token["expires_at"]:
+            return _mpesa_token["value"]
+
+        token, expires_in = create_access_token()
+        # Refresh ahead of expiry so a token never expires mid-request
+        refresh_in = max(expires_in - config.MPESA_TOKEN_REFRESH_MARGIN, 0)
+        _mpesa_token["value"] = token
+        _mpesa_token["expires_at"] = now + refresh_in
+        return token
 
-        if not token:
-            return {"error": "Token was not obtained successfully"}, 401
-        request.token = token
-        
-        return f(*args, **kwargs)
-    
-    return decorated_function
+
+def clear_mpesa_token():
+    with _mpesa_token_lock:
+        _mpesa_token["value"] = None
+        _mpesa_token["expires_at"] = 0.0
 
 
 def generate_timestamp():
@@ -46,15 +69,73 @@ def generate_password():
     encoded_password = base64.b64encode(data_to_encode.encode()).decode('utf-8')
     return encoded_password
 
+# Verified claims of recently seen tokens, keyed by a digest of the token so
+# repeat requests skip signature verification. Entries never outlive the
+# token's own exp claim.
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+def _token_digest(token):
+    return hashlib.sha256(token.encode()).digest()
+
+
+def decode_token_cached(token):
+    key = _token_digest(token)
+    now = time.time()
+
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+        if entry is not None:
+            claims, expires_at = entry
+            if now < expires_at:
+                _token_cache.move_to_end(key)
+                return claims
+            del _token_cache[key]
+
+    claims = decode_token(token)
+    expires_at = claims.get('exp')
+    if expires_at is None:
+        expires_at = now + config.TOKEN_CACHE_MAX_TTL
+
+    with _token_cache_lock:
+        _token_cache[key] = (claims, min(expires_at, now + config.TOKEN_CACHE_MAX_TTL))
+        _token_cache.move_to_end(key)
+        while len(_token_cache) > config.TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+
+    return claims
+
+
+def evict_cached_token(token):
+    with _token_cache_lock:
+        _token_cache.pop(_token_digest(token), None)
+
+
+def bearer_token():
+    """The token from an 'Authorization: Bearer <token>' header, or None if it is malformed."""
+    header = request.headers.get('Authorization', '')
+    parts = header.split()
+    if len(parts) != 2 or parts[0].lower() != 'bearer' or parts[1].count('.') != 2:
+        return None
+    return parts[1]
+
+
 # Custom decorator to run middleware before specific routes
 def with_user_middleware(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        token = request.headers.get('Authorization')  # Extract token from headers (e.g., Bearer token)
+        header = request.headers.get('Authorization')  # Extract token from headers (e.g., Bearer token)
         
-        if token:
-            token = token.split()[1]  # Remove 'Bearer' and get the actual token
-            decoded_token = decode_token(token)  # Extract or decode the token to get user_id
+        if header:
+            token = bearer_token()  # Remove 'Bearer' and get the actual token
+            if token is None:
+                return {"error": "Malformed Authorization header"}, 401
+
+            decoded_token = decode_token_cached(token)  # Extract or decode the token to get user_id
+            if revocation_list.is_revoked(decoded_token['jti']):
+                return {"error": "Token has been revoked"}, 401
+
             g.user_id = decoded_token['sub']['id']  # Store the user_id in g (global context for the request)
         else:
             g.user_id = None